@@ -0,0 +1,307 @@
+"""
+Benchmarks what AutoMod's message listener costs per message.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_automod [--save-baseline FILE] [--baseline FILE]
+
+Synthetic corpora (clean chat, long pastes, URL-heavy text, obfuscated
+profanity and Hinglish) are fed through `AutoMod.on_message` with mocked
+`discord.Message` objects, so the whole scanning path runs without a
+gateway connection. Violations are recorded instead of being deleted.
+Every message is unique, so the verdict cache does not hide the scan.
+
+The end-to-end table reports messages per second and p50/p99 latency per
+corpus. The per-rule table times each check on its own over all corpora.
+`--save-baseline` writes the results as JSON; `--baseline` compares a run
+against such a file and exits with status 1 when a p99 got slower by more
+than `--tolerance`.
+
+Each corpus and rule is timed `--repeat` times with the garbage collector
+off, emptying the verdict and fuzzy caches in between. Percentiles are
+taken over each message's fastest time, so one burst of noise on a shared
+machine does not read as a regression.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import random
+import sys
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+import discord
+
+from cogs.automod import AutoMod
+from utils.flood import FloodLimits
+from utils.fuzzy import DEFAULT_THRESHOLD
+from utils.rules import CHECKS, FLOOD, compile_guild_rules, guild_config
+from utils.scanner import BAD_WORD, FUZZY_WORD, INVITE, LINK
+
+GUILD_ID = 1
+CHANNEL_ID = 10
+
+# p99 changes smaller than this are timer noise and never count as regressions.
+NOISE_FLOOR_MS = 0.05
+
+CLEAN = (
+    "hey everyone how is it going today did anyone watch the match last night "
+    "i think we should start the raid at nine if that works for the team "
+    "thanks for the help earlier the bot is working great now see you later"
+).split()
+HINGLISH = (
+    "kya haal hai bhai sab theek aaj match dekha kya bahut maza aaya yaar "
+    "kal milte hai chalo phir baat karte hai mujhe nahi pata kaun aa raha hai"
+).split()
+URLS = [
+    "https://example.com/docs/getting-started", "http://status.example.org", "www.youtube.com/watch?v=abc123",
+    "https://github.com/user/repo/issues/42", "discord.gg/abcdef", "https://cdn.discordapp.com/attachments/1/2/a.png",
+    "https://shop.example.net/cart?id=9", "https://en.wikipedia.org/wiki/Python",
+]
+LEET = str.maketrans({"a": "4", "e": "3", "i": "1", "o": "0", "s": "5", "t": "7"})
+LOOKALIKES = str.maketrans({"a": "а", "e": "е", "o": "о", "c": "с", "p": "р", "x": "х"})
+
+
+def _obfuscate(word: str, rng: random.Random) -> str:
+    style = rng.randrange(5)
+    if style == 0:
+        return word.translate(LEET)
+    if style == 1:
+        return ".".join(word)
+    if style == 2:
+        return word.upper().translate(LOOKALIKES)
+    if style == 3:
+        return "".join(c * rng.randint(1, 3) for c in word)
+    return word.replace("u", "*", 1)
+
+
+def _sentence(words, rng: random.Random, length: int) -> str:
+    return " ".join(rng.choice(words) for _ in range(length))
+
+
+def build_corpora(bad_words: list, count: int, rng: random.Random) -> dict:
+    """Returns `count` unique messages per corpus; a counter keeps each one distinct."""
+    single = [w for w in bad_words if " " not in w and w.isalpha() and len(w) > 3]
+    corpora = {
+        "clean": lambda i: f"{_sentence(CLEAN, rng, rng.randint(4, 20))} {i}",
+        "long_paste": lambda i: f"{_sentence(CLEAN + HINGLISH, rng, 350)[:1990]} {i}",
+        "url_heavy": lambda i: " ".join(rng.choice(URLS) for _ in range(rng.randint(1, 6))) + f" {_sentence(CLEAN, rng, 5)} {i}",
+        "obfuscated": lambda i: f"{_sentence(CLEAN, rng, rng.randint(3, 10))} {_obfuscate(rng.choice(single), rng)} {i}",
+        "hinglish": lambda i: f"{_sentence(HINGLISH, rng, rng.randint(4, 25))} {i}",
+    }
+    return {name: [make(i) for i in range(count)] for name, make in corpora.items()}
+
+
+def make_message(message_id: int, content: str, guild, channel):
+    """A stand-in `discord.Message` with just the attributes the listener reads."""
+    author = mock.Mock(spec=discord.Member)
+    author.id = message_id  # a different member per message, so flood checks never fire
+    author.bot = False
+    author.roles = []
+    author.guild_permissions = discord.Permissions.none()
+    return SimpleNamespace(
+        id=message_id, content=content, author=author, guild=guild, channel=channel,
+        embeds=[], attachments=[], raw_mentions=[], raw_role_mentions=[], mention_everyone=False,
+    )
+
+
+def percentiles(samples: list) -> tuple:
+    samples = sorted(samples)
+    return samples[len(samples) // 2], samples[min(int(len(samples) * 0.99), len(samples) - 1)]
+
+
+def reset_caches(cog: AutoMod):
+    """Empties the caches a previous run filled, so every run scans from cold."""
+    cog.scanner.cache.clear()
+    cog.word_list.fuzzy_index.best_match.cache_clear()
+
+
+def fastest(runs: list) -> list:
+    """Each sample's lowest time over the runs (lists of timings in the same order)."""
+    return [min(times) for times in zip(*runs)]
+
+
+def summarize(samples: list) -> dict:
+    p50, p99 = percentiles(samples)
+    return {"p50_ms": round(p50, 4), "p99_ms": round(p99, 4)}
+
+
+async def bench_listener(cog: AutoMod, corpora: dict, repeat: int) -> dict:
+    guild = SimpleNamespace(id=GUILD_ID)
+    channel = SimpleNamespace(id=CHANNEL_ID)
+    flagged = {}
+
+    async def record_violation(message, reason):
+        flagged[message.id] = reason
+    cog._handle_violation = record_violation
+
+    # The runs go round all corpora in turn, so a slow spell of the machine
+    # only ever hits one of each message's runs.
+    runs = {name: [] for name in corpora}
+    elapsed = {name: [] for name in corpora}
+    flagged_counts = {}
+    message_id = 0
+    for _ in range(repeat):
+        for name, texts in corpora.items():
+            # Fresh ids (and so fresh authors) every run, so no per-message state carries over.
+            messages = []
+            for text in texts:
+                message_id += 1
+                messages.append(make_message(message_id, text, guild, channel))
+            reset_caches(cog)
+            samples = []
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                for message in messages:
+                    t = time.perf_counter()
+                    await cog.on_message(message)
+                    samples.append((time.perf_counter() - t) * 1000)
+                elapsed[name].append(time.perf_counter() - start)
+            finally:
+                gc.enable()
+            runs[name].append(samples)
+            flagged_counts[name] = sum(1 for message in messages if message.id in flagged)
+
+    return {
+        name: {
+            "msgs_per_s": round(len(texts) / min(elapsed[name]), 1),
+            **summarize(fastest(runs[name])),
+            "flagged": flagged_counts[name],
+        }
+        for name, texts in corpora.items()
+    }
+
+
+def time_rule(cog: AutoMod, texts: list, rules, baseline_rules=None) -> list:
+    """
+    Times `rules` on each text. With `baseline_rules`, reports only the time
+    on top of them (fuzzy matching runs on top of the exact word scan).
+    """
+    reset_caches(cog)
+    samples = []
+    gc.disable()
+    try:
+        for text in texts:
+            t = time.perf_counter()
+            cog.scanner._scan(text, rules)
+            elapsed = time.perf_counter() - t
+            if baseline_rules is not None:
+                t = time.perf_counter()
+                cog.scanner._scan(text, baseline_rules)
+                elapsed = max(elapsed - (time.perf_counter() - t), 0.0)
+            samples.append(elapsed * 1000)
+    finally:
+        gc.enable()
+    return samples
+
+
+def time_flood(cog: AutoMod, texts: list, run: int) -> list:
+    limits = FloodLimits()
+    samples = []
+    gc.disable()
+    try:
+        for i, text in enumerate(texts):
+            t = time.perf_counter()
+            # A different member per run, so each run starts from an empty flood record.
+            cog.flood.check((GUILD_ID, run, i), limits, 0, hash(text))
+            samples.append((time.perf_counter() - t) * 1000)
+    finally:
+        gc.enable()
+    return samples
+
+
+def bench_rules(cog: AutoMod, corpora: dict, repeat: int) -> dict:
+    """Times each check on its own by compiling rules with every other check off."""
+    texts = [text for corpus in corpora.values() for text in corpus]
+    compiled = {}
+    for rule in (BAD_WORD, FUZZY_WORD, INVITE, LINK):
+        config = {"disabled_checks": [c for c in CHECKS if c != (BAD_WORD if rule == FUZZY_WORD else rule)]}
+        if rule == FUZZY_WORD:
+            config["fuzzy_threshold"] = DEFAULT_THRESHOLD
+        rules = compile_guild_rules(guild_config(config), cog.word_list)
+        baseline_rules = None
+        if rule == FUZZY_WORD:
+            baseline_rules = compile_guild_rules(guild_config({**config, "fuzzy_threshold": None}), cog.word_list)
+        compiled[rule] = (rules, baseline_rules)
+
+    # Interleaved like the listener runs.
+    runs = {rule: [] for rule in (*compiled, FLOOD)}
+    for run in range(repeat):
+        for rule, (rules, baseline_rules) in compiled.items():
+            runs[rule].append(time_rule(cog, texts, rules, baseline_rules))
+        runs[FLOOD].append(time_flood(cog, texts, run))
+    return {rule: summarize(fastest(samples)) for rule, samples in runs.items()}
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    """Prints p99 changes against a baseline and returns True if any got too slow."""
+    regressed = False
+    print(f"\ncomparison with baseline (tolerance {tolerance:.0%}):")
+    for section in ("listener", "rules"):
+        for name, current in results[section].items():
+            old = baseline.get(section, {}).get(name)
+            if not old:
+                continue
+            change = (current["p99_ms"] - old["p99_ms"]) / old["p99_ms"] if old["p99_ms"] else 0.0
+            bad = change > tolerance and current["p99_ms"] - old["p99_ms"] > NOISE_FLOOR_MS
+            regressed |= bad
+            print(f"{section + '/' + name:<22} p99 {old['p99_ms']:>8.3f}ms -> {current['p99_ms']:>8.3f}ms ({change:+.0%}){'  REGRESSION' if bad else ''}")
+    return regressed
+
+
+async def run(args) -> int:
+    rng = random.Random(args.seed)
+    cog = AutoMod(SimpleNamespace())
+    repeat = max(1, args.repeat)
+    try:
+        cog.settings = {str(GUILD_ID): {"fuzzy_threshold": DEFAULT_THRESHOLD if args.fuzzy else None}}
+        corpora = build_corpora(list(cog.word_list.words), args.messages, rng)
+
+        results = {
+            "words": len(cog.word_list.word_filter),
+            "messages_per_corpus": args.messages,
+            "listener": await bench_listener(cog, corpora, repeat),
+            "rules": bench_rules(cog, corpora, repeat),
+        }
+    finally:
+        # Stop every loop the cog started in __init__.
+        cog.watch_word_sources.cancel()
+        cog.flush_stats.cancel()
+
+    print(f"{'corpus':<12} {'msgs/s':>9} {'p50':>9} {'p99':>9} {'flagged':>8}")
+    for name, r in results["listener"].items():
+        print(f"{name:<12} {r['msgs_per_s']:>9.0f} {r['p50_ms']:>7.3f}ms {r['p99_ms']:>7.3f}ms {r['flagged']:>8}")
+    print(f"\n{'rule':<12} {'p50':>9} {'p99':>9}")
+    for name, r in results["rules"].items():
+        print(f"{name:<12} {r['p50_ms']:>7.3f}ms {r['p99_ms']:>7.3f}ms")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+        print(f"\nbaseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=1000, help="messages per corpus")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per corpus and rule; each message's fastest time is kept")
+    parser.add_argument("--no-fuzzy", dest="fuzzy", action="store_false", help="run the listener with fuzzy matching off")
+    parser.add_argument("--save-baseline", metavar="FILE", help="write the results to this JSON file")
+    parser.add_argument("--baseline", metavar="FILE", help="compare against results saved with --save-baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p99 slowdown against the baseline")
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Benchmarks AutoMod's normalization + matching on 2000-character messages.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_wordfilter [--budget-ms 2.0]
+
+Exits with status 1 if the slowest corpus goes over the per-message budget.
+Each corpus is timed `--repeat` times with the garbage collector off and
+the lowest p99 is kept, so one burst of noise on a shared machine does not
+fail the run.
+"""
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+
+from utils.matcher import WordFilter
+from utils.normalize import fold
+
+MESSAGE_LENGTH = 2000  # Discord's message length limit.
+
+
+def _fill(parts, rng) -> str:
+    words = []
+    length = 0
+    while length < MESSAGE_LENGTH:
+        word = rng.choice(parts)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:MESSAGE_LENGTH]
+
+
+def build_corpora(rng: random.Random) -> dict:
+    clean = "hello everyone this is a normal chat message with nothing bad in it as usual".split()
+    leet = ["h3ll0", "ev3ry0ne!", "s0me", "ch4t", "f.u.n", "w1th", "l33t", "sp3ak", "100", "24/7"]
+    unicode = ["ѕоmе", "сyrillic", "émojis", "🎉", "ｆｕｌｌｗｉｄｔｈ", "café", "zero​width"]
+    hinglish = "kya haal hai bhai sab theek aaj match dekha kya bahut maza aaya yaar".split()
+    repeats = ["heyyyyy", "sooooo", "gooood", "nooooo", "yessss", "lolll"]
+    return {
+        "clean": _fill(clean, rng),
+        "leetspeak": _fill(leet, rng),
+        "unicode": _fill(unicode + clean, rng),
+        "hinglish": _fill(hinglish, rng),
+        "repeats": _fill(repeats + clean, rng),
+    }
+
+
+def time_per_message(func, text: str, rounds: int) -> list:
+    samples = []
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            func(text)
+            samples.append((time.perf_counter() - start) * 1000)
+    finally:
+        gc.enable()
+    samples.sort()
+    return samples
+
+
+def percentile(samples: list, q: float) -> float:
+    return samples[int(len(samples) * q)]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--words", default="bad_words.json", help="JSON file with a 'bad_words' list")
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per corpus; the lowest p99 is kept")
+    parser.add_argument("--budget-ms", type=float, default=2.0, help="allowed p99 per message")
+    args = parser.parse_args()
+
+    with open(args.words, "r", encoding="utf-8") as f:
+        words = json.load(f)["bad_words"]
+
+    start = time.perf_counter()
+    word_filter = WordFilter(words)
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"compiled {len(words)} words into {len(word_filter)} canonical entries in {build_ms:.1f} ms")
+
+    over_budget = False
+    print(f"{'corpus':<10} {'fold p50':>9} {'total p50':>10} {'total p99':>10}")
+    for name, text in build_corpora(random.Random(0)).items():
+        fold_ms = time_per_message(fold, text, args.rounds)
+        runs = [time_per_message(word_filter.search, text, args.rounds) for _ in range(max(1, args.repeat))]
+        total_ms = min(runs, key=lambda samples: percentile(samples, 0.99))
+        p50, p99 = percentile(total_ms, 0.5), percentile(total_ms, 0.99)
+        over_budget |= p99 > args.budget_ms
+        print(f"{name:<10} {percentile(fold_ms, 0.5):>8.3f}ms {p50:>8.3f}ms {p99:>8.3f}ms")
+
+    print(f"budget: {args.budget_ms:.2f} ms per message (p99) -> {'FAIL' if over_budget else 'ok'}")
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,44 +1,275 @@
 import discord
-from discord.ext import commands
-import re
+from discord import app_commands
+from discord.ext import commands, tasks
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+
+from utils.cache import TTLCache
+from utils.deletion import delete_messages
+from utils.domains import url_host
+from utils.flood import FLOOD_DUPLICATES, FLOOD_MENTIONS, FLOOD_MESSAGES, FloodDetector, FloodLimits
+from utils.fuzzy import DEFAULT_THRESHOLD, MIN_THRESHOLD
+from utils.rules import CHECKS, FLOOD, compile_guild_rules, guild_config, needs_own_word_list
+from utils.scanner import BAD_WORD, FUZZY_WORD, INVITE, LINK, ContentScanner
+from utils.stats import RuleStats
+from utils.wordlist import load_word_filter, merge_sources
+
+log = logging.getLogger('discord.automod')
+
+# Warning sent for each rule, in order of priority.
+VIOLATION_REASONS = {
+    BAD_WORD: "watch your language! 🤫",
+    FUZZY_WORD: "watch your language! 🤫",
+    INVITE: "Discord invites are not allowed! 🚫",
+    LINK: "posting links is not allowed! 🔗",
+    FLOOD_MESSAGES: "slow down, you are sending messages too fast! 🐢",
+    FLOOD_MENTIONS: "stop mass-mentioning members! 📣",
+    FLOOD_DUPLICATES: "stop repeating the same message! 🔁",
+}
+
+# Violations in a channel are collected for this many seconds, then deleted
+# with one bulk-delete call and answered with one combined warning.
+VIOLATION_BATCH_WINDOW = 1.0
+
+# Word list files merged with the hardcoded list. Edits to them are picked up
+# by the watcher without reloading the cog.
+WORD_SOURCES = ["bad_words.json", "badworsds.txt"]
 
 class AutoMod(commands.Cog):
     """
     A cog for automatic moderation of a Discord server.
     
     Features:
-    - Filters a comprehensive list of bad words.
-    - Blocks Discord invite links and other URLs.
-    - Ignores messages from bots and users with 'Manage Server' permissions.
+    - Filters a comprehensive list of bad words, including obfuscated spellings.
+    - Rescans edited messages, embed titles and descriptions and attachment filenames.
+    - Blocks Discord invite links and other URLs, with per-server allowed and denied domains.
+    - Optionally catches near-miss spellings with per-server fuzzy matching.
+    - Detects message, mention and duplicate-line floods per member.
+    - Per-server rule sets: checks, extra or removed words, exempt roles and
+      channels.
+    - Shadow (dry-run) mode with per-rule hit counts and timings.
+    - Ignores messages from bots and (unless disabled) users with 'Manage Server' permissions.
     """
+    automod = app_commands.Group(
+        name="automod",
+        description="Configure AutoMod for this server.",
+        guild_only=True,
+        default_permissions=discord.Permissions(manage_guild=True)
+    )
+
     def __init__(self, bot):
         self.bot = bot
-        # The set of bad words is created once on startup for efficiency.
-        self.bad_words = self._get_bad_words_list()
-
-        # Regex patterns are compiled once for efficiency.
-        # This single regex now correctly handles all specified Discord-related links.
-        self.invite_regex = re.compile(
-            r"(?i)"  # Case-insensitive flag
-            r"(?:https?://)?"  # Optional http:// or https://
-            r"(?:www\.)?"  # Optional www.
-            r"(?:"
-            r"discord(?:app)?\.com/(?:invite|channels|api/oauth2/authorize|template)/[^\s/]+"
-            r"|discord\.gg/[^\s/]+"
-            r"|discord\.gift/[^\s/]+"
-            r"|discord\.new/[^\s/]+"
-            r"|cdn\.discordapp\.com/[^\s/]+"
-            r"|media\.discordapp\.net/[^\s/]+"
-            r")"
-        )
-        
-        # This regex handles all other general URLs.
-        self.url_regex = re.compile(r"https?://\S+|www\.\S+")
+        self.settings_file = "automod_settings.json"
+        self.settings = self._load_settings()
+        # The bad words are folded to their canonical spellings and compiled
+        # into a single matcher, so obfuscated variants and multi-word entries
+        # all match in one pass over the normalized message. The compiled
+        # result is cached on disk and only rebuilt when a source changes.
+        # Near-miss spellings are looked up through a trigram index, so only a
+        # handful of candidates per token are scored with fuzzywuzzy.
+        self.word_list = self._compile_word_list()
+        self._source_mtimes = self._get_source_mtimes()
+        self._reload_lock = asyncio.Lock()
+
+        # Every content rule (words, invites, links) is checked by one scanner.
+        # Its verdicts are cached, so copy-paste spam is only scanned once.
+        self.scanner = ContentScanner(TTLCache(maxsize=4096, ttl=300))
+
+        # Each server's settings are compiled once into a GuildRules, so the
+        # listener only does a dict lookup. Entries are dropped whenever the
+        # server's settings or the word list change.
+        self._guild_rules = {}  # guild_id (None for DMs) -> GuildRules, or the asyncio.Task compiling them
+
+        # Hashes of the text of recently seen messages, so edits that don't
+        # change it are not scanned again.
+        self._recent_hashes = TTLCache(maxsize=10000, ttl=3600)  # message_id -> digest
+
+        # Flood tracking keeps a small fixed-size record per active member.
+        self.flood = FloodDetector(idle_after=300)
+
+        # Pending violations per channel, flushed in batches.
+        self._violation_queues = {}  # channel_id -> {message_id: (message, reason)}
+        self._flush_tasks = {}  # channel_id -> asyncio.Task
+
+        # Shadow mode hit counters and latency histograms per server, saved periodically.
+        self.stats_file = "automod_stats.json"
+        self.stats = self._load_stats()  # str(guild_id) -> RuleStats
+        self._stats_dirty = False
+
+        self.watch_word_sources.start()
+        self.flush_stats.start()
+
+    async def cog_unload(self):
+        self.watch_word_sources.cancel()
+        self.flush_stats.cancel()
+        if self._stats_dirty:
+            self._write_stats(self._snapshot_stats())
+        # Handle whatever is still queued instead of dropping it.
+        for task in self._flush_tasks.values():
+            task.cancel()
+        for channel_id in list(self._violation_queues):
+            await self._flush_violations(channel_id)
+
+    def _load_settings(self) -> dict:
+        """Loads the per-server AutoMod settings from automod_settings.json."""
+        try:
+            with open(self.settings_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_settings(self):
+        """Saves the per-server AutoMod settings to automod_settings.json."""
+        try:
+            with open(self.settings_file, 'w', encoding='utf-8') as f:
+                json.dump(self.settings, f, indent=4)
+        except IOError as e:
+            log.error(f"Failed to save AutoMod settings to {self.settings_file}: {e}")
+
+    # --- Shadow Mode Statistics ---
+
+    def _load_stats(self) -> dict:
+        """Loads the shadow mode statistics from automod_stats.json."""
+        try:
+            with open(self.stats_file, 'r', encoding='utf-8') as f:
+                return {guild_id: RuleStats.from_dict(data) for guild_id, data in json.load(f).items()}
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write_stats(self, snapshot: dict):
+        """Writes a snapshot of the statistics atomically, so a crash never leaves a half-written file."""
+        tmp_path = f"{self.stats_file}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, indent=4)
+            os.replace(tmp_path, self.stats_file)
+        except IOError as e:
+            log.error(f"Failed to save AutoMod statistics to {self.stats_file}: {e}")
+
+    def _snapshot_stats(self) -> dict:
+        self._stats_dirty = False
+        return {guild_id: stats.to_dict() for guild_id, stats in self.stats.items()}
+
+    @tasks.loop(minutes=5)
+    async def flush_stats(self):
+        """Saves the shadow mode statistics in a worker thread when they changed."""
+        if self._stats_dirty:
+            await asyncio.to_thread(self._write_stats, self._snapshot_stats())
+
+    def _shadow_check(self, message, rules, text: str, digest: bytes, flood: bool):
+        """Runs the checks on a message and records the would-be violations and their cost."""
+        stats = self.stats.get(str(message.guild.id))
+        if stats is None:
+            stats = self.stats[str(message.guild.id)] = RuleStats()
+        stats.messages += 1
+        hit_rules = []
+
+        if flood and FLOOD in rules.checks and rules.flood_limits:
+            started = time.perf_counter()
+            rule = self._check_flood(message, rules)
+            stats.record_latency(FLOOD, (time.perf_counter() - started) * 1000)
+            if rule:
+                hit_rules.append(rule)
+
+        # Scanned without the verdict cache, so the timings show the real cost of each rule.
+        self._recent_hashes.put(message.id, digest)
+        verdict, timings = self.scanner.scan_timed(text, rules)
+        for rule, ms in timings.items():
+            stats.record_latency(rule, ms)
+        hit_rules.extend(rule for rule in VIOLATION_REASONS if rule in verdict.rules)
+
+        for rule in hit_rules:
+            stats.record_hit(rule)
+        if hit_rules:
+            log.info(f"AutoMod (shadow): {', '.join(hit_rules)} in message {message.id} from {message.author} (ID: {message.author.id}).")
+        self._stats_dirty = True
+
+    # --- Word List ---
+
+    def _compile_word_list(self):
+        """Merges every word list source and loads (or compiles) its matcher."""
+        return load_word_filter(merge_sources(WORD_SOURCES, self._get_bad_words_list()))
+
+    def _get_source_mtimes(self) -> dict:
+        """Returns the modification time of each word list file that exists."""
+        return {path: os.path.getmtime(path) for path in WORD_SOURCES if os.path.exists(path)}
+
+    async def reload_word_list(self):
+        """
+        Recompiles the word list in a worker thread and swaps it in with a single
+        assignment, so messages being scanned keep using the list they started with.
+        """
+        async with self._reload_lock:
+            self._source_mtimes = self._get_source_mtimes()
+            self.word_list = await asyncio.to_thread(self._compile_word_list)
+            self._guild_rules = {}
+            return self.word_list
+
+    @tasks.loop(seconds=30)
+    async def watch_word_sources(self):
+        """Reloads the word list when one of its files changes on disk."""
+        if self._get_source_mtimes() != self._source_mtimes:
+            word_list = await self.reload_word_list()
+            log.info(f"AutoMod word list reloaded ({len(word_list.word_filter)} entries, {word_list.digest[:16]}).")
+
+    # --- Per-Server Rules ---
+
+    async def _get_rules(self, guild):
+        """Returns the compiled rules for a server (or the defaults for DMs), compiling them if needed."""
+        guild_id = guild.id if guild else None
+        rules = self._guild_rules.get(guild_id)
+        if isinstance(rules, asyncio.Task):
+            # Already being compiled; share that compile instead of starting another.
+            return await asyncio.shield(rules)
+        if rules is None:
+            word_list = self.word_list
+            config = guild_config(self.settings.get(str(guild_id), {}) if guild else {})
+            if needs_own_word_list(config):
+                # A custom word list means compiling a new matcher; keep that off the event loop.
+                task = asyncio.create_task(self._compile_rules(guild_id, config, word_list))
+                self._guild_rules[guild_id] = task
+                return await asyncio.shield(task)
+            rules = compile_guild_rules(config, word_list)
+            # Only cache rules built against the current word list, in case it was reloaded meanwhile.
+            if word_list is self.word_list:
+                self._guild_rules[guild_id] = rules
+        return rules
+
+    async def _compile_rules(self, guild_id, config: dict, word_list):
+        """Compiles a server's rules in a worker thread, replacing its pending entry in `_guild_rules` when done."""
+        task = asyncio.current_task()
+        try:
+            rules = await asyncio.to_thread(compile_guild_rules, config, word_list)
+        except BaseException:
+            if self._guild_rules.get(guild_id) is task:
+                del self._guild_rules[guild_id]
+            raise
+        # A settings change or word list reload meanwhile drops the entry; don't cache stale rules then.
+        if self._guild_rules.get(guild_id) is task:
+            if word_list is self.word_list:
+                self._guild_rules[guild_id] = rules
+            else:
+                del self._guild_rules[guild_id]
+        return rules
+
+    def _update_guild_settings(self, guild_id: int, **changes):
+        """Applies changes to a server's settings, saves them and drops its compiled rules."""
+        self.settings.setdefault(str(guild_id), {}).update(changes)
+        self._save_settings()
+        self._guild_rules.pop(guild_id, None)
+
+    def _get_guild_config(self, guild_id: int) -> dict:
+        return guild_config(self.settings.get(str(guild_id), {}))
 
     def _get_bad_words_list(self):
         """
         Returns a hardcoded set of all the bad words.
         This replaces the need to fetch them from an external URL.
+        It is merged with the word list files in WORD_SOURCES.
         """
         # The word list provided by the user is maintained as is.
         word_list = [
@@ -284,57 +515,389 @@ class AutoMod(commands.Cog):
         return set(word.lower() for word in word_list)
 
     async def _handle_violation(self, message, reason):
-        """A helper function to delete a message and send a warning."""
+        """
+        Queues a message for deletion and warning. Violations in the same channel
+        are batched for VIOLATION_BATCH_WINDOW seconds, so a spam wave costs one
+        bulk delete and one warning per channel instead of two calls per message.
+        """
+        channel_id = message.channel.id
+        self._violation_queues.setdefault(channel_id, {})[message.id] = (message, reason)
+        if channel_id not in self._flush_tasks:
+            self._flush_tasks[channel_id] = asyncio.create_task(self._flush_after_window(channel_id))
+
+    async def _flush_after_window(self, channel_id):
+        await asyncio.sleep(VIOLATION_BATCH_WINDOW)
+        self._flush_tasks.pop(channel_id, None)
+        await self._flush_violations(channel_id)
+
+    async def _flush_violations(self, channel_id):
+        """Deletes every queued message in a channel and sends one combined warning."""
+        pending = self._violation_queues.pop(channel_id, None)
+        if not pending:
+            return
+        channel = next(iter(pending.values()))[0].channel
+        messages = [message for message, _ in pending.values()]
+
         try:
-            await message.delete()
-            # The warning message is sent to the channel where the violation occurred.
-            await message.channel.send(f"{message.author.mention}, {reason}", delete_after=10)
+            # Young messages go in bulk chunks; older ones (e.g. found by edit rescans) one by one.
+            await delete_messages(channel, messages)
+
+            # One warning per channel, grouping the members by reason.
+            by_reason = {}
+            for message, reason in pending.values():
+                mentions = by_reason.setdefault(reason, [])
+                if message.author.mention not in mentions:
+                    mentions.append(message.author.mention)
+            warning = "\n".join(f"{', '.join(mentions)}, {reason}" for reason, mentions in by_reason.items())
+            await channel.send(
+                warning[:2000],
+                delete_after=10,
+                allowed_mentions=discord.AllowedMentions(everyone=False, roles=False, users=True)
+            )
         except discord.Forbidden:
-            # This error is printed to your console if the bot lacks permissions.
-            print(f"Could not delete message in #{message.channel.name}. Missing 'Manage Messages' Permission.")
-        except discord.NotFound:
-            # This handles cases where the message was already deleted.
-            pass
-        except Exception as e:
+            log.warning(f"Could not delete messages in #{channel.name}. Missing 'Manage Messages' Permission.")
+        except Exception:
             # Catch any other potential exceptions during handling.
-            print(f"An error occurred in _handle_violation: {e}")
+            log.exception(f"An error occurred while flushing AutoMod violations in #{channel.name}.")
+
+    def _is_exempt(self, message, rules) -> bool:
+        """Whether a message's author or channel is exempt from AutoMod in its server."""
+        # Ignore users with "Manage Server" permission (i.e., moderators/admins),
+        # unless the server turned that off, and exempt roles and channels.
+        # First, ensure the message is in a server (not a DM).
+        if isinstance(message.author, discord.Member):
+            if rules.bypass_manage_guild and message.author.guild_permissions.manage_guild:
+                return True
+            if rules.exempt_roles and any(role.id in rules.exempt_roles for role in message.author.roles):
+                return True
+        return message.channel.id in rules.exempt_channels
+
+    @staticmethod
+    def _get_scannable_text(message) -> str:
+        """Joins the content, embed titles and descriptions and attachment filenames of a message."""
+        parts = [message.content]
+        for embed in message.embeds:
+            parts.append(embed.title or "")
+            parts.append(embed.description or "")
+        # Without the extension, which the normalizer would glue onto the name ("bad.png" -> "badpng").
+        parts.extend(os.path.splitext(attachment.filename)[0] for attachment in message.attachments)
+        return "\n".join(part for part in parts if part)
+
+    @staticmethod
+    def _hash_text(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    def _check_flood(self, message, rules):
+        """Records a message for flood detection and returns the flood rule it breaks, or None."""
+        if not message.guild or FLOOD not in rules.checks or not rules.flood_limits:
+            return None
+        mentions = len(message.raw_mentions) + len(message.raw_role_mentions) + message.mention_everyone
+        content_hash = hash(message.content) if message.content else None
+        return self.flood.check((message.guild.id, message.author.id), rules.flood_limits, mentions, content_hash)
+
+    async def _scan_message(self, message, rules, text: str, digest: bytes):
+        """Scans a message's text against every content rule and acts on the highest-priority hit."""
+        # Scan the content against every rule in one go: bad words (with
+        # normalization for leetspeak, look-alike letters and separators),
+        # near-miss spellings if the server opted in, invites and links.
+        self._recent_hashes.put(message.id, digest)
+        verdict = self.scanner.scan(text, rules)
+        if not verdict:
+            return
+
+        # Act on the highest-priority rule that was hit.
+        for rule, reason in VIOLATION_REASONS.items():
+            hit = verdict.first(rule)
+            if hit:
+                log.info(f"AutoMod: {rule} hit {hit.match!r} at {hit.start}-{hit.end} in message {message.id} from {message.author} (ID: {message.author.id}).")
+                await self._handle_violation(message, reason)
+                return
 
     @commands.Cog.listener()
     async def on_message(self, message):
         """This function is called for every message sent in the server."""
-        # 1. Ignore messages sent by bots to prevent loops.
-        if message.author.bot:
+        # 1. Ignore messages sent by bots to prevent loops, and DMs (which can't be bulk-deleted or moderated).
+        if message.author.bot or message.guild is None:
             return
 
-        # 2. Ignore users with "Manage Server" permission (i.e., moderators/admins).
-        # First, ensure the message is in a server (not a DM).
-        if isinstance(message.author, discord.Member):
-            if message.author.guild_permissions.manage_guild:
-                return
+        # 2. Ignore exempt members and channels.
+        rules = await self._get_rules(message.guild)
+        if self._is_exempt(message, rules):
+            return
+
+        text = self._get_scannable_text(message)
+
+        # In shadow mode, only record what would have happened.
+        if rules.shadow:
+            self._shadow_check(message, rules, text, self._hash_text(text), flood=True)
+            return
+
+        # 3. Check for message, mention and duplicate-line floods.
+        rule = self._check_flood(message, rules)
+        if rule:
+            log.info(f"AutoMod: {rule} by {message.author} (ID: {message.author.id}) in message {message.id}.")
+            await self._handle_violation(message, VIOLATION_REASONS[rule])
+            return
+
+        # 4. Scan the text and act on the highest-priority rule that was hit.
+        await self._scan_message(message, rules, text, self._hash_text(text))
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        """
+        Rescans edited messages, so a clean message can't be edited into a violation.
+        Also fires when Discord adds link embeds, which are scanned the same way.
+        """
+        message = payload.message
+        if message.author.bot or message.guild is None:
+            return
+
+        # Edits that leave the scanned text as it was (pins, embeds being
+        # suppressed, ...) are skipped through the hashes of recent messages.
+        text = self._get_scannable_text(message)
+        digest = self._hash_text(text)
+        if self._recent_hashes.get(message.id) == digest:
+            return
+
+        rules = await self._get_rules(message.guild)
+        if self._is_exempt(message, rules):
+            return
+        # Edits are not counted towards flood limits; only the text is rescanned.
+        if rules.shadow:
+            self._shadow_check(message, rules, text, digest, flood=False)
+        else:
+            await self._scan_message(message, rules, text, digest)
+
+    @automod.command(name="fuzzy", description="Catch misspelled bad words with fuzzy matching.")
+    @app_commands.describe(
+        enabled="Whether fuzzy matching is enabled in this server",
+        threshold=f"Minimum similarity ({MIN_THRESHOLD}-100) to count as a bad word (default {DEFAULT_THRESHOLD})"
+    )
+    async def fuzzy(self, interaction: discord.Interaction, enabled: bool, threshold: app_commands.Range[int, MIN_THRESHOLD, 100] = DEFAULT_THRESHOLD):
+        self._update_guild_settings(interaction.guild.id, fuzzy_threshold=threshold if enabled else None)
+
+        if enabled:
+            await interaction.response.send_message(f"✅ Fuzzy matching enabled with a similarity threshold of {threshold}.", ephemeral=True)
+        else:
+            await interaction.response.send_message("✅ Fuzzy matching disabled.", ephemeral=True)
+
+    @automod.command(name="flood", description="Configure message, mention and duplicate flood limits.")
+    @app_commands.describe(
+        enabled="Whether flood detection is enabled in this server",
+        messages="Messages allowed per window (0 to disable this check)",
+        seconds="Length of the message window in seconds",
+        mentions="Mentions allowed per 15 seconds (0 to disable this check)",
+        duplicates="Identical messages allowed in a row (0 to disable this check)"
+    )
+    async def flood_config(
+        self,
+        interaction: discord.Interaction,
+        enabled: bool,
+        messages: app_commands.Range[int, 0, 50] = FloodLimits.messages,
+        seconds: app_commands.Range[int, 1, 60] = int(FloodLimits.message_window),
+        mentions: app_commands.Range[int, 0, 100] = FloodLimits.mentions,
+        duplicates: app_commands.Range[int, 0, 20] = FloodLimits.duplicates
+    ):
+        if enabled:
+            flood = {"messages": messages, "message_window": seconds, "mentions": mentions, "duplicates": duplicates}
+        else:
+            flood = None
+        self._update_guild_settings(interaction.guild.id, flood=flood)
+
+        if enabled:
+            await interaction.response.send_message(
+                f"✅ Flood detection enabled: {messages} messages per {seconds}s, {mentions} mentions per 15s, {duplicates} repeats in a row.",
+                ephemeral=True
+            )
+        else:
+            await interaction.response.send_message("✅ Flood detection disabled.", ephemeral=True)
 
-        # Get the message content in lowercase for case-insensitive matching.
-        content = message.content.lower()
+    @automod.command(name="check", description="Turn one of the AutoMod checks on or off.")
+    @app_commands.describe(check="The check to configure", enabled="Whether the check is enabled in this server")
+    @app_commands.choices(check=[app_commands.Choice(name=name.replace("_", " ").title(), value=name) for name in CHECKS])
+    async def check(self, interaction: discord.Interaction, check: app_commands.Choice[str], enabled: bool):
+        disabled = set(self._get_guild_config(interaction.guild.id)["disabled_checks"])
+        if enabled:
+            disabled.discard(check.value)
+        else:
+            disabled.add(check.value)
+        self._update_guild_settings(interaction.guild.id, disabled_checks=sorted(disabled))
+        await interaction.response.send_message(f"✅ {check.name} check {'enabled' if enabled else 'disabled'}.", ephemeral=True)
 
-        # 3. Check for bad words (Optimized Logic).
-        # We split the message into words and check if any word is in our bad_words set.
-        # This is more efficient than creating a new set for every message.
-        if any(word in self.bad_words for word in re.split(r'[\s,.!?]+', content)):
-            await self._handle_violation(message, "watch your language! 🤫")
+    @automod.command(name="word", description="Add a bad word for this server, or allow one from the global list.")
+    @app_commands.describe(action="Whether to block or allow the word", word="The word or phrase")
+    @app_commands.choices(action=[
+        app_commands.Choice(name="Block", value="block"),
+        app_commands.Choice(name="Allow", value="allow"),
+    ])
+    async def word(self, interaction: discord.Interaction, action: app_commands.Choice[str], word: app_commands.Range[str, 1, 100]):
+        word = word.strip().lower()
+        if not word:
+            await interaction.response.send_message("❌ The word cannot be empty.", ephemeral=True)
             return
+        config = self._get_guild_config(interaction.guild.id)
+        extra, removed = set(config["extra_words"]), set(config["removed_words"])
+        if action.value == "block":
+            extra.add(word)
+            removed.discard(word)
+        else:
+            removed.add(word)
+            extra.discard(word)
+        self._update_guild_settings(interaction.guild.id, extra_words=sorted(extra), removed_words=sorted(removed))
+        await interaction.response.send_message(f"✅ `{word}` is now {'blocked' if action.value == 'block' else 'allowed'} in this server.", ephemeral=True)
 
-        # 4. Check for Discord invites using the specific invite regex.
-        if self.invite_regex.search(content):
-            await self._handle_violation(message, "Discord invites are not allowed! 🚫")
+    @automod.command(name="resetwords", description="Drop this server's word additions and exceptions.")
+    async def resetwords(self, interaction: discord.Interaction):
+        self._update_guild_settings(interaction.guild.id, extra_words=[], removed_words=[])
+        await interaction.response.send_message("✅ This server now uses the global word list.", ephemeral=True)
+
+    @automod.command(name="exemptrole", description="Exempt a role from AutoMod, or remove the exemption.")
+    @app_commands.describe(role="The role to configure", exempt="Whether members with this role are ignored")
+    async def exemptrole(self, interaction: discord.Interaction, role: discord.Role, exempt: bool):
+        roles = set(self._get_guild_config(interaction.guild.id)["exempt_roles"])
+        if exempt:
+            roles.add(role.id)
+        else:
+            roles.discard(role.id)
+        self._update_guild_settings(interaction.guild.id, exempt_roles=sorted(roles))
+        await interaction.response.send_message(f"✅ {role.mention} is {'now' if exempt else 'no longer'} exempt from AutoMod.", ephemeral=True)
+
+    @automod.command(name="exemptchannel", description="Exempt a channel from AutoMod, or remove the exemption.")
+    @app_commands.describe(channel="The channel to configure", exempt="Whether messages in this channel are ignored")
+    async def exemptchannel(self, interaction: discord.Interaction, channel: discord.TextChannel, exempt: bool):
+        channels = set(self._get_guild_config(interaction.guild.id)["exempt_channels"])
+        if exempt:
+            channels.add(channel.id)
+        else:
+            channels.discard(channel.id)
+        self._update_guild_settings(interaction.guild.id, exempt_channels=sorted(channels))
+        await interaction.response.send_message(f"✅ {channel.mention} is {'now' if exempt else 'no longer'} exempt from AutoMod.", ephemeral=True)
+
+    @automod.command(name="domain", description="Allow or deny links to a domain and its subdomains.")
+    @app_commands.describe(
+        action="Allow links even with the link check on, deny them even with it off, or drop the rule",
+        domain="The domain, e.g. youtube.com"
+    )
+    @app_commands.choices(action=[
+        app_commands.Choice(name="Allow", value="allow"),
+        app_commands.Choice(name="Deny", value="deny"),
+        app_commands.Choice(name="Remove", value="remove"),
+    ])
+    async def domain(self, interaction: discord.Interaction, action: app_commands.Choice[str], domain: app_commands.Range[str, 1, 253]):
+        # Stored in the same normalized (lowercase, punycode) form the scanner looks up.
+        domain = url_host(domain.strip())
+        if not domain or " " in domain or "." not in domain:
+            await interaction.response.send_message("❌ Please give a domain such as `youtube.com`.", ephemeral=True)
             return
+        config = self._get_guild_config(interaction.guild.id)
+        allowed, denied = set(config["allowed_domains"]), set(config["denied_domains"])
+        allowed.discard(domain)
+        denied.discard(domain)
+        if action.value == "allow":
+            allowed.add(domain)
+        elif action.value == "deny":
+            denied.add(domain)
+        self._update_guild_settings(interaction.guild.id, allowed_domains=sorted(allowed), denied_domains=sorted(denied))
+
+        if action.value == "remove":
+            await interaction.response.send_message(f"✅ Removed the rule for `{domain}`.", ephemeral=True)
+        else:
+            await interaction.response.send_message(f"✅ Links to `{domain}` and its subdomains are now {'allowed' if action.value == 'allow' else 'denied'}.", ephemeral=True)
+
+    @automod.command(name="bypass", description="Choose whether members with 'Manage Server' skip AutoMod.")
+    @app_commands.describe(enabled="Whether members with 'Manage Server' are ignored")
+    async def bypass(self, interaction: discord.Interaction, enabled: bool):
+        self._update_guild_settings(interaction.guild.id, bypass_manage_guild=enabled)
+        await interaction.response.send_message(
+            f"✅ Members with 'Manage Server' are {'ignored' if enabled else 'now checked'} by AutoMod.", ephemeral=True
+        )
+
+    @automod.command(name="settings", description="Show this server's AutoMod settings.")
+    async def show_settings(self, interaction: discord.Interaction):
+        rules = await self._get_rules(interaction.guild)
+        config = self._get_guild_config(interaction.guild.id)
+        embed = discord.Embed(title="🛡️ AutoMod Settings", color=discord.Color.blurple())
+        embed.add_field(
+            name="Checks",
+            value="\n".join(f"{'✅' if name in rules.checks else '❌'} {name.replace('_', ' ').title()}" for name in CHECKS),
+            inline=True
+        )
+        embed.add_field(name="Fuzzy Matching", value=f"Threshold {rules.fuzzy_threshold}" if rules.fuzzy_threshold else "Off", inline=True)
+        limits = rules.flood_limits
+        embed.add_field(
+            name="Flood Limits",
+            value=f"{limits.messages} msgs / {limits.message_window:g}s\n{limits.mentions} mentions / {limits.mention_window:g}s\n{limits.duplicates} repeats" if limits else "Off",
+            inline=True
+        )
+        embed.add_field(
+            name="Word List",
+            value=f"{len(rules.word_list.word_filter)} entries (+{len(config['extra_words'])} / -{len(config['removed_words'])} for this server)",
+            inline=False
+        )
+        embed.add_field(name="Exempt Roles", value=" ".join(f"<@&{r}>" for r in config["exempt_roles"])[:1024] or "None", inline=False)
+        embed.add_field(name="Exempt Channels", value=" ".join(f"<#{c}>" for c in config["exempt_channels"])[:1024] or "None", inline=False)
+        embed.add_field(name="Allowed Domains", value=", ".join(rules.domains.allowed)[:1024] or "None", inline=False)
+        embed.add_field(name="Denied Domains", value=", ".join(rules.domains.denied)[:1024] or "None", inline=False)
+        embed.add_field(name="Manage Server Bypass", value="On" if rules.bypass_manage_guild else "Off", inline=False)
+        embed.add_field(name="Shadow Mode", value="On (nothing is deleted)" if rules.shadow else "Off", inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @automod.command(name="shadow", description="Record what AutoMod would do without deleting anything.")
+    @app_commands.describe(enabled="Whether shadow (dry-run) mode is enabled in this server")
+    async def shadow(self, interaction: discord.Interaction, enabled: bool):
+        self._update_guild_settings(interaction.guild.id, shadow=enabled)
+        if enabled:
+            await interaction.response.send_message(
+                "✅ Shadow mode enabled. AutoMod will only record would-be violations; see `/automod stats`.", ephemeral=True
+            )
+        else:
+            await interaction.response.send_message("✅ Shadow mode disabled. AutoMod is enforcing its rules again.", ephemeral=True)
+
+    @automod.command(name="stats", description="Show shadow mode hits and timings per rule.")
+    @app_commands.describe(reset="Clear the statistics after showing them")
+    async def stats_command(self, interaction: discord.Interaction, reset: bool = False):
+        stats = self.stats.get(str(interaction.guild.id))
+        if stats is None or not stats.messages:
+            await interaction.response.send_message("❌ No shadow mode statistics yet. Enable it with `/automod shadow`.", ephemeral=True)
+            return
+
+        embed = discord.Embed(title="🕵️ AutoMod Shadow Statistics", color=discord.Color.blurple())
+        embed.add_field(name="Messages Checked", value=str(stats.messages), inline=False)
+        hits = "\n".join(
+            f"**{rule.replace('_', ' ').title()}**: {count} ({count / stats.messages:.1%})"
+            for rule, count in sorted(stats.hits.items(), key=lambda item: -item[1])
+        )
+        embed.add_field(name="Would-Be Violations", value=hits or "None", inline=False)
+        latency = "\n".join(
+            f"**{rule.replace('_', ' ').title()}**: p50 ≤ {h.percentile(0.5):g}ms, p99 ≤ {h.percentile(0.99):g}ms, mean {h.mean:.3f}ms"
+            for rule, h in stats.latency.items()
+        )
+        embed.add_field(name="Latency per Rule", value=latency or "None", inline=False)
+        if reset:
+            del self.stats[str(interaction.guild.id)]
+            self._stats_dirty = True
+            embed.set_footer(text="Statistics have been reset.")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @automod.command(name="reload", description="Reload the bad word list from its files.")
+    async def reload(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
+        word_list = await self.reload_word_list()
+        await interaction.followup.send(
+            f"✅ Word list reloaded: {len(word_list.word_filter)} entries (version `{word_list.digest[:16]}`).",
+            ephemeral=True
+        )
 
-        # 5. Check for any other links/URLs.
-        # This check is now separate from the Discord invite check.
-        if self.url_regex.search(content):
-            # To avoid flagging Discord CDN/media links twice, we double-check
-            # that it wasn't already caught by the invite_regex.
-            if not self.invite_regex.search(content):
-                 await self._handle_violation(message, "posting links is not allowed! 🔗")
-                 return
+    @automod.command(name="cache", description="Show AutoMod verdict cache statistics.")
+    async def cache(self, interaction: discord.Interaction):
+        stats = self.scanner.cache.stats()
+        embed = discord.Embed(title="🗃️ AutoMod Verdict Cache", color=discord.Color.blurple())
+        embed.add_field(name="Entries", value=f"{stats['size']} / {stats['maxsize']}", inline=True)
+        embed.add_field(name="Hit Rate", value=f"{stats['hit_rate']:.1%}", inline=True)
+        embed.add_field(name="Hits", value=str(stats['hits']), inline=True)
+        embed.add_field(name="Misses", value=str(stats['misses']), inline=True)
+        embed.add_field(name="Evictions", value=str(stats['evictions']), inline=True)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
 
 # Standard setup function to load the cog into the bot.
 async def setup(bot):
@@ -1,13 +1,19 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
 import asyncio
 import random
 import json
 import os
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
+from utils.timers import DeadlineQueue
+
+def end_timestamp(giveaway: dict) -> float:
+    """Unix timestamp of a giveaway's end_time (stored as naive UTC ISO format)."""
+    return datetime.fromisoformat(giveaway["end_time"]).replace(tzinfo=timezone.utc).timestamp()
+
 def is_admin():
     def predicate(interaction: discord.Interaction) -> bool:
         return interaction.user.guild_permissions.administrator
@@ -19,10 +25,21 @@ class GiveawaySystem(commands.Cog):
         self.active_giveaways = {}
         self.giveaway_data_file = "giveaways.json"
         self.load_giveaways()
-        self.check_giveaways.start()
+        # Only giveaways that haven't ended, by end time; ended ones stay in
+        # active_giveaways for /reroll but are never looked at again.
+        self.pending = DeadlineQueue(
+            (giveaway_id, end_timestamp(giveaway))
+            for giveaway_id, giveaway in self.active_giveaways.items()
+            if not giveaway.get("ended", False)
+        )
+        self.scheduler_task = None
+
+    async def cog_load(self):
+        self.scheduler_task = asyncio.create_task(self.run_scheduler())
 
     def cog_unload(self):
-        self.check_giveaways.cancel()
+        if self.scheduler_task:
+            self.scheduler_task.cancel()
         self.save_giveaways()
 
     def load_giveaways(self):
@@ -102,6 +119,7 @@ class GiveawaySystem(commands.Cog):
         }
 
         self.save_giveaways()
+        self.pending.push(giveaway_id, end_timestamp(self.active_giveaways[giveaway_id]))
         await interaction.edit_original_response(
             content=f"✅ Giveaway created successfully! It will end <t:{int(end_time.timestamp())}:R>"
         )
@@ -164,6 +182,7 @@ class GiveawaySystem(commands.Cog):
         await interaction.edit_original_response(content="✅ Giveaway ended successfully!")
 
     async def end_giveaway_by_id(self, giveaway_id: str, early_end: bool = False):
+        self.pending.discard(giveaway_id)
         try:
             giveaway = self.active_giveaways[giveaway_id]
             channel = self.bot.get_channel(giveaway["channel_id"])
@@ -200,34 +219,27 @@ class GiveawaySystem(commands.Cog):
         except Exception as e:
             print(f"Error ending giveaway {giveaway_id}: {e}")
 
-    @tasks.loop(minutes=1)
-    async def check_giveaways(self):
-        current_time = datetime.utcnow()
-        for giveaway_id, giveaway in list(self.active_giveaways.items()):
-            if giveaway.get("ended", False):
-                continue
-            end_time = datetime.fromisoformat(giveaway["end_time"])
-            if current_time >= end_time:
-                await self.end_giveaway_by_id(giveaway_id)
-
-    @check_giveaways.before_loop
-    async def before_check_giveaways(self):
+    async def run_scheduler(self):
+        # Sleeps until the next giveaway ends. Giveaways that ended while the
+        # bot was offline are due right away, oldest first.
         await self.bot.wait_until_ready()
+        while True:
+            giveaway_id = await self.pending.next_due()
+            await self.end_giveaway_by_id(giveaway_id)
 
     @is_admin()
     @app_commands.command(name="giveaways", description="List all active giveaways")
     async def list_giveaways(self, interaction: discord.Interaction):
-        active = [g for g in self.active_giveaways.values() if not g.get("ended", False)]
+        active = [self.active_giveaways[giveaway_id] for giveaway_id, _ in self.pending.items()]
         if not active:
             await interaction.response.send_message("No active giveaways found!", ephemeral=True)
             return
 
         embed = discord.Embed(title="🎉 Active Giveaways", color=0x00ff00, timestamp=datetime.utcnow())
         for giveaway in active[:10]:
-            end_time = datetime.fromisoformat(giveaway["end_time"])
             embed.add_field(
                 name=f"🏆 {giveaway['prize'][:50]}{'...' if len(giveaway['prize']) > 50 else ''}",
-                value=f"Ends <t:{int(end_time.timestamp())}:R>\nMessage ID: `{giveaway['message_id']}`",
+                value=f"Ends <t:{int(end_timestamp(giveaway))}:R>\nMessage ID: `{giveaway['message_id']}`",
                 inline=False
             )
         embed.set_footer(text=f"Showing {min(len(active), 10)} of {len(active)} active giveaways")
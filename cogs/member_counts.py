@@ -0,0 +1,79 @@
+import discord
+from discord.ext import commands
+import logging
+
+from utils.member_counts import GuildCounts, MemberCounters
+
+log = logging.getLogger('discord.member_counts')
+
+
+class MemberCounts(commands.Cog):
+    """
+    Keeps humans, bots, boosters and per-role member counts for every guild.
+
+    Counts are seeded once per guild after its members are chunked, then
+    updated from member events, so other cogs can read them without walking
+    the member list: `bot.get_cog("MemberCounts").get(guild)`.
+    """
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.counters = MemberCounters()
+
+    async def cog_load(self):
+        # When the cog is (re)loaded on a running bot, guilds are already chunked.
+        if self.bot.is_ready():
+            self._seed_all()
+
+    def get(self, guild: discord.Guild) -> GuildCounts:
+        return self.counters.get(guild)
+
+    def _seed_all(self):
+        for guild in self.bot.guilds:
+            if guild.chunked:
+                self.counters.seed(guild)
+        log.info(f"Seeded member counts for {len(self.bot.guilds)} guilds.")
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # on_ready fires after the startup chunking, and again after a full
+        # reconnect, when the member cache was rebuilt.
+        self._seed_all()
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        if not guild.chunked:
+            await guild.chunk()
+        self.counters.seed(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.counters.drop(guild.id)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        counts = self.counters.peek(member.guild.id)
+        if counts is not None:
+            counts.add(member)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        counts = self.counters.peek(member.guild.id)
+        if counts is not None:
+            counts.remove(member)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        counts = self.counters.peek(after.guild.id)
+        if counts is not None:
+            counts.update(before, after)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        counts = self.counters.peek(role.guild.id)
+        if counts is not None:
+            counts.drop_role(role.id)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(MemberCounts(bot))
@@ -1,52 +1,230 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from datetime import datetime, timedelta
-from typing import Optional, Union
-import json
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Union
 import logging
 import asyncio
+import copy
 import re
+import time
+from collections import deque
+
+from utils.ban_cache import BanCache
+from utils.cache import TTLCache
+from utils.deletion import bulk_delete_cutoff, delete_chunk, delete_single
+from utils.escalation import ACTIONS, ESCALATE_MUTE, EscalationPolicy, EscalationStep
+from utils.persistence import WriteBehindFile, load_json
+from utils.timers import Timer, TimerService
+from utils.warning_store import WarningStore
 
 # --- Setup professional logging ---
 log = logging.getLogger('discord.moderation_cog')
 
+WARNINGS_PAGE_SIZE = 5
+
+# Purges delete messages younger than 14 days in bulk chunks, and older
+# messages (which the bulk endpoint rejects) one at a time with a pause.
+PURGE_MAX_AMOUNT = 100_000
+PURGE_CHUNK_SIZE = 100
+OLD_MESSAGE_DELETE_DELAY = 1.0
+
+# Long-running commands edit their response at most this often (seconds).
+PROGRESS_INTERVAL = 2.0
+
+# Channels edited at the same time during a lockdown. discord.py waits out
+# the rate limit of each route on its own; this keeps bursts small.
+LOCKDOWN_WORKERS = 5
+
+# Members edited at the same time by a bulk role job. Role edits share a
+# per-guild rate limit that discord.py waits out, so more workers only queue.
+ROLE_JOB_WORKERS = 4
+
+# guild.bulk_ban takes at most this many users per call.
+MASSBAN_BATCH_SIZE = 200
+
+# What a lockdown denies @everyone, on top of the channel's own overwrite.
+LOCKDOWN_DENY = dict(send_messages=False, send_messages_in_threads=False, create_public_threads=False, create_private_threads=False)
+
+# Kinds of timers the cog schedules (see _on_timer).
+TIMER_UNBAN = "unban"
+TIMER_UNLOCK = "unlock"
+TIMER_SLOWMODE = "slowmode"
+
+# Members whose recent warning times are kept in memory for escalation; others are reloaded from the index.
+ESCALATION_CACHE_SIZE = 10_000
+
+class PurgeCancelView(discord.ui.View):
+    """A Cancel button for a running purge."""
+
+    def __init__(self, owner_id: int, cancelled: asyncio.Event):
+        super().__init__(timeout=None)
+        self.owner_id = owner_id
+        self.cancelled = cancelled
+
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.danger)
+    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if interaction.user.id != self.owner_id:
+            await interaction.response.send_message("❌ Only the moderator who started this purge can cancel it.", ephemeral=True)
+            return
+        self.cancelled.set()
+        button.disabled = True
+        await interaction.response.edit_message(content="⏹️ Cancelling purge...", view=self)
+
+class ConfirmView(discord.ui.View):
+    """Confirm and Cancel buttons for a destructive action. `value` is True once confirmed."""
+
+    def __init__(self, owner_id: int, timeout: float = 120):
+        super().__init__(timeout=timeout)
+        self.owner_id = owner_id
+        self.value = None
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.owner_id:
+            await interaction.response.send_message("❌ Only the moderator who ran this command can answer.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="Confirm", style=discord.ButtonStyle.danger)
+    async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.value = True
+        await interaction.response.defer()
+        self.stop()
+
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary)
+    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.value = False
+        await interaction.response.defer()
+        self.stop()
+
+class WarningPages(discord.ui.View):
+    """
+    Pages through warnings with Previous/Next buttons. Each page is loaded on
+    demand with a cursor (the id of the last warning shown), so paging costs
+    the same however long the history is.
+    """
+
+    def __init__(self, owner_id: int, fetch, render, page_size: int = WARNINGS_PAGE_SIZE):
+        super().__init__(timeout=180)
+        self.owner_id = owner_id
+        self.fetch = fetch  # async (before_id, limit) -> list of WarningRecord
+        self.render = render  # (warnings, page number) -> discord.Embed
+        self.page_size = page_size
+        self.cursors = [None]  # before_id of every page visited so far
+        self.page = []
+
+    async def load(self) -> discord.Embed:
+        """Loads the page at the current cursor and returns its embed."""
+        # One extra row tells whether there is a next page.
+        rows = await self.fetch(self.cursors[-1], self.page_size + 1)
+        self.page = rows[:self.page_size]
+        self.previous.disabled = len(self.cursors) == 1
+        self.next.disabled = len(rows) <= self.page_size
+        return self.render(self.page, len(self.cursors))
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.owner_id:
+            await interaction.response.send_message("❌ Only the moderator who ran this command can change pages.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="◀ Previous", style=discord.ButtonStyle.secondary)
+    async def previous(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.cursors.pop()
+        await interaction.response.edit_message(embed=await self.load(), view=self)
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary)
+    async def next(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.cursors.append(self.page[-1].id)
+        await interaction.response.edit_message(embed=await self.load(), view=self)
+
 class Moderation(commands.Cog):
     """
     A professional Discord.py cog for moderation commands.
-    This version uses a JSON file for persistent warning storage,
+    This version stores warnings in an indexed SQLite database,
     logs all moderation actions, and uses granular permissions.
     Enhanced with additional features like slowmode, purge, lockdown, etc.
     """
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        # Warnings live in SQLite (WAL mode): a warn is one indexed insert
+        # instead of a rewrite of the whole history. The old warnings.json
+        # is imported once on first start.
         self.warnings_file = "warnings.json"
-        self.warnings_cache = self._load_warnings()
-        self.locked_channels = set()  # In-memory track of locked channels
+        self.warning_store = WarningStore("warnings.db")
+        self.warning_store.migrate_json(self.warnings_file)
 
-    # --- Data Persistence for Warnings ---
+        # Other state is kept in memory and saved write-behind: commands only
+        # mark it dirty, and a background task writes it off the event loop.
+        self.state_file = "moderation_state.json"
+        state = load_json(self.state_file, {})
+        self.locked_channels = set(state.get("locked_channels", []))  # Channels locked by the bot
+        # str(guild_id) -> {"state": "locking" | "locked" | "lifting", "reason": str,
+        #                   "channels": {str(channel_id): @everyone overwrite before the lockdown},
+        #                   "done": [channel ids handled in the current phase]}
+        self.lockdowns = state.get("lockdowns", {})
+        self._lockdown_tasks = {}  # guild_id -> asyncio.Task applying or lifting a lockdown
+        # str(guild_id) -> {"action": "add" | "remove", "role_id": int, "reason": str, "moderator_id": int,
+        #                   "members": [member ids, sorted], "cursor": members before this index are done,
+        #                   "failed": int, "channel_id": int, "message_id": int}
+        self.role_jobs = state.get("role_jobs", {})
+        self._role_job_tasks = {}  # guild_id -> asyncio.Task running a bulk role job
+        # guild_id -> EscalationPolicy applied on every /warn
+        self.escalation = {int(gid): EscalationPolicy.from_list(steps) for gid, steps in state.get("escalation", {}).items()}
+        # (guild_id, member_id) -> deque of the member's latest warning timestamps, oldest first
+        self._recent_warnings = TTLCache(ESCALATION_CACHE_SIZE, ttl=86400)
+        self._state = WriteBehindFile(self.state_file, self._snapshot_state)
 
-    def _load_warnings(self) -> dict:
-        """Loads the warnings dictionary from warnings.json."""
-        try:
-            with open(self.warnings_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            log.info("warnings.json not found or is invalid. Starting with an empty cache.")
-            return {}
-
-    def _save_warnings(self):
-        """Saves the warnings cache to warnings.json."""
-        try:
-            with open(self.warnings_file, 'w', encoding='utf-8') as f:
-                json.dump(self.warnings_cache, f, indent=4)
-        except IOError as e:
-            log.error(f"Failed to save warnings to {self.warnings_file}: {e}")
+        self.active_purges = {}  # channel_id -> asyncio.Event set to cancel the purge
+        self.ban_cache = BanCache()  # Ban lists for /unban autocomplete, loaded on first use
+
+        # Temporary bans, timed locks and timed slowmode expire through a
+        # persisted timer service, so they still expire after a restart.
+        self.timers = TimerService(self._on_timer, "timers.db")
+
+    # --- Data Persistence ---
+
+    def _snapshot_state(self) -> dict:
+        """Returns a JSON-ready copy of the state saved in moderation_state.json."""
+        return {
+            "locked_channels": sorted(self.locked_channels),
+            "lockdowns": copy.deepcopy(self.lockdowns),
+            "escalation": {str(gid): policy.to_list() for gid, policy in self.escalation.items() if policy},
+            "role_jobs": copy.deepcopy(self.role_jobs),
+        }
+
+    async def cog_load(self):
+        # Finish lockdowns that were being applied or lifted when the bot stopped.
+        if self.lockdowns:
+            asyncio.create_task(self._resume_lockdowns())
+        if self.role_jobs:
+            asyncio.create_task(self._resume_role_jobs())
+        asyncio.create_task(self._start_timers())
+
+    async def cog_unload(self):
+        # Runs on unload and when the bot shuts down, so no change is lost.
+        # Running jobs stop first, so their last checkpoint is in the final
+        # save and a reloaded cog resumes them exactly once.
+        await self._cancel_tasks(self._lockdown_tasks)
+        await self._cancel_tasks(self._role_job_tasks)
+        await self.timers.close()
+        await self._state.close()
+        self.warning_store.close()
+
+    @staticmethod
+    async def _cancel_tasks(tasks: dict):
+        """Cancels the tasks in a {key: asyncio.Task} dict and waits until they have stopped."""
+        pending = list(tasks.values())
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
 
-    def _get_warnings_key(self, guild_id: int, member_id: int) -> str:
-        """Generates a consistent string key for JSON compatibility."""
-        return f"{guild_id}-{member_id}"
+    async def _start_timers(self):
+        # Timers need the guild cache, including those that expired while offline.
+        await self.bot.wait_until_ready()
+        await self.timers.start()
+        log.info(f"Loaded {len(self.timers)} pending moderation timers.")
 
     # --- Helper Methods ---
 
@@ -83,6 +261,57 @@ class Moderation(commands.Cog):
         except ValueError:
             return None
 
+    async def _on_timer(self, timer: Timer):
+        """Undoes a temporary action when its timer expires."""
+        guild = self.bot.get_guild(timer.guild_id)
+        if guild is None:
+            log.warning(f"Dropping {timer.kind} timer for guild {timer.guild_id}: the bot is no longer in it.")
+            return
+
+        if timer.kind == TIMER_UNBAN:
+            try:
+                await guild.unban(discord.Object(id=timer.target_id), reason="Temporary ban expired")
+                log.info(f"Temporary ban of user {timer.target_id} in '{guild.name}' expired; user unbanned.")
+            except discord.NotFound:
+                pass  # Already unbanned by hand.
+            return
+
+        channel = guild.get_channel(timer.target_id)
+        if channel is None:
+            return
+        if timer.kind == TIMER_UNLOCK:
+            await channel.set_permissions(guild.default_role, send_messages=None, reason="Timed lock expired")
+            self.locked_channels.discard(channel.id)
+            self._state.mark_dirty()
+            log.info(f"Timed lock of #{channel.name} in '{guild.name}' expired; channel unlocked.")
+        elif timer.kind == TIMER_SLOWMODE:
+            await channel.edit(slowmode_delay=timer.data.get("previous", 0), reason="Timed slowmode expired")
+            log.info(f"Timed slowmode in #{channel.name} in '{guild.name}' expired.")
+
+    async def _mute_member(self, member: discord.Member, delta: timedelta, duration: str, reason: str, moderator: discord.abc.User):
+        """Times a member out, logs it and notifies them. Used by /mute and warning escalation."""
+        await member.timeout(delta, reason=reason)
+        log.info(f"'{moderator}' (ID: {moderator.id}) muted '{member}' (ID: {member.id}) for {duration}. Reason: {reason}")
+        await self.send_dm_notification(member, "muted", reason, member.guild.name, duration)
+
+    async def _ban_member(self, member: discord.Member, reason: str, moderator: discord.abc.User,
+                          delta: Optional[timedelta] = None, duration: str = None, delete_seconds: int = 0) -> Optional[float]:
+        """
+        Notifies, bans and logs a member, scheduling the unban if `delta` is
+        given. Returns when the ban expires (a Unix timestamp), or None if it
+        is permanent. Used by /ban and warning escalation.
+        """
+        await self.send_dm_notification(member, "banned", reason, member.guild.name, duration)
+        await member.ban(reason=reason, delete_message_seconds=delete_seconds)
+        log.info(f"'{moderator}' (ID: {moderator.id}) banned '{member}' (ID: {member.id}) for {duration or 'ever'}. Reason: {reason}")
+        if delta:
+            expires_at = time.time() + delta.total_seconds()
+            await self.timers.schedule(TIMER_UNBAN, member.guild.id, member.id, expires_at)
+            return expires_at
+        # A permanent ban replaces an earlier temporary one.
+        await self.timers.cancel(TIMER_UNBAN, member.guild.id, member.id)
+        return None
+
     async def send_dm_notification(self, member: discord.Member, action: str, reason: str, guild_name: str, duration: str = None):
         """Send DM notification to member about moderation action."""
         try:
@@ -131,23 +360,20 @@ class Moderation(commands.Cog):
         if not await self.check_hierarchy(interaction, member):
             return
 
-        key = self._get_warnings_key(interaction.guild.id, member.id)
-        new_warning = {
-            "moderator_id": interaction.user.id,
-            "reason": reason,
-            "timestamp": int(datetime.utcnow().timestamp())
-        }
-        
-        user_warnings = self.warnings_cache.setdefault(key, [])
-        user_warnings.append(new_warning)
-        self._save_warnings()
+        policy = self.escalation.get(interaction.guild.id)
+        recent = await self._recent_warning_times(interaction.guild.id, member.id, policy.depth) if policy else None
+        timestamp = int(datetime.utcnow().timestamp())
+        warning_count = await asyncio.to_thread(
+            self.warning_store.add,
+            interaction.guild.id, member.id, interaction.user.id, reason, timestamp
+        )
         
         log.info(f"'{interaction.user}' (ID: {interaction.user.id}) warned '{member}' (ID: {member.id}) in guild '{interaction.guild.name}' (ID: {interaction.guild.id}) for reason: {reason}")
 
         embed = discord.Embed(title="⚠️ Member Warned", color=discord.Color.yellow(), timestamp=datetime.utcnow())
         embed.add_field(name="Member", value=member.mention, inline=True)
         embed.add_field(name="Moderator", value=interaction.user.mention, inline=True)
-        embed.add_field(name="Total Warnings", value=str(len(user_warnings)), inline=True)
+        embed.add_field(name="Total Warnings", value=str(warning_count), inline=True)
         embed.add_field(name="Reason", value=reason, inline=False)
         embed.set_footer(text=f"Member ID: {member.id}")
         await interaction.response.send_message(embed=embed)
@@ -156,31 +382,84 @@ class Moderation(commands.Cog):
         if not dm_sent:
             await interaction.followup.send("Could not notify the user via DM.", ephemeral=True)
 
+        if policy:
+            recent.append(timestamp)
+            step = policy.evaluate(recent, timestamp)
+            if step:
+                await self._escalate(interaction, member, step)
+
+    async def _recent_warning_times(self, guild_id: int, member_id: int, depth: int) -> deque:
+        """
+        Returns the timestamps of a member's latest `depth` warnings, oldest
+        first. They are cached between warns; on a miss they are read from
+        the member index of the warning store, not from the whole history.
+        """
+        key = (guild_id, member_id)
+        recent = self._recent_warnings.get(key)
+        if recent is None or recent.maxlen < depth:
+            rows = await asyncio.to_thread(self.warning_store.latest, guild_id, member_id, depth)
+            recent = deque(sorted(w.timestamp for w in rows), maxlen=depth)
+            self._recent_warnings.put(key, recent)
+        return recent
+
+    async def _escalate(self, interaction: discord.Interaction, member: discord.Member, step: EscalationStep):
+        """Applies an escalation step through the same code as /mute and /ban."""
+        reason = f"Automatic escalation: {step.warnings} warnings within {self._format_window(step.window)}"
+        delta = self.parse_duration(step.duration) if step.duration else None
+        try:
+            if step.action == ESCALATE_MUTE:
+                await self._mute_member(member, delta, step.duration, reason, interaction.user)
+                outcome = f"Muted for {step.duration}"
+            else:
+                expires_at = await self._ban_member(member, reason, interaction.user, delta, step.duration)
+                outcome = f"Banned until <t:{int(expires_at)}:F>" if expires_at else "Banned"
+        except discord.Forbidden:
+            await interaction.followup.send(f"❌ Escalation to {step.action} failed: I don't have permission to {step.action} this member.", ephemeral=True)
+            return
+
+        embed = discord.Embed(title="📈 Warning Escalation", color=discord.Color.dark_red(), timestamp=datetime.utcnow())
+        embed.add_field(name="Member", value=member.mention, inline=True)
+        embed.add_field(name="Action", value=outcome, inline=True)
+        embed.add_field(name="Reason", value=reason, inline=False)
+        await interaction.followup.send(embed=embed)
+
+    @staticmethod
+    def _format_window(seconds: int) -> str:
+        days = seconds // 86400
+        return f"{days} day{'s' if days != 1 else ''}"
+
     @app_commands.checks.has_permissions(manage_messages=True)
     @app_commands.command(name="warnings", description="View all warnings for a member.")
     @app_commands.describe(member="The member whose warnings you want to see")
     async def warnings(self, interaction: discord.Interaction, member: discord.Member):
-        key = self._get_warnings_key(interaction.guild.id, member.id)
-        warnings_list = self.warnings_cache.get(key, [])
-
-        if not warnings_list:
+        warning_count = await asyncio.to_thread(self.warning_store.count, interaction.guild.id, member.id)
+        if not warning_count:
             await interaction.response.send_message(f"{member.mention} has no warnings.", ephemeral=True)
             return
 
-        embed = discord.Embed(title=f"Warnings for {member.display_name}", color=discord.Color.orange(), timestamp=datetime.utcnow())
-        embed.set_author(name=member, icon_url=member.display_avatar.url)
-        
-        # Display up to 10 most recent warnings
-        for w in reversed(warnings_list[-10:]):
-            moderator = interaction.guild.get_member(w["moderator_id"]) or f"ID: {w['moderator_id']}"
-            embed.add_field(
-                name=f"Warned on <t:{w['timestamp']}:D>",
-                value=f"**Moderator:** {moderator}\n**Reason:** {w['reason']}",
-                inline=False
-            )
-        
-        embed.set_footer(text=f"Total warnings: {len(warnings_list)} | Showing latest 10")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        async def fetch(before_id, limit):
+            return await asyncio.to_thread(self.warning_store.latest, interaction.guild.id, member.id, limit, before_id)
+
+        def render(warnings_list, page):
+            embed = discord.Embed(title=f"Warnings for {member.display_name}", color=discord.Color.orange(), timestamp=datetime.utcnow())
+            embed.set_author(name=member, icon_url=member.display_avatar.url)
+            for w in warnings_list:
+                moderator = interaction.guild.get_member(w.moderator_id) or f"ID: {w.moderator_id}"
+                embed.add_field(
+                    name=f"Warned on <t:{w.timestamp}:D>",
+                    value=f"**Moderator:** {moderator}\n**Reason:** {w.reason}",
+                    inline=False
+                )
+            pages = -(-warning_count // WARNINGS_PAGE_SIZE)
+            embed.set_footer(text=f"Total warnings: {warning_count} | Page {page}/{pages}")
+            return embed
+
+        view = WarningPages(interaction.user.id, fetch, render)
+        embed = await view.load()
+        if warning_count > WARNINGS_PAGE_SIZE:
+            await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+        else:
+            await interaction.response.send_message(embed=embed, ephemeral=True)
 
     @app_commands.checks.has_permissions(manage_messages=True)
     @app_commands.command(name="clearwarnings", description="Clear all warnings for a member.")
@@ -189,11 +468,9 @@ class Moderation(commands.Cog):
         if not await self.check_hierarchy(interaction, member):
             return
 
-        key = self._get_warnings_key(interaction.guild.id, member.id)
-        if key in self.warnings_cache and self.warnings_cache[key]:
-            warning_count = len(self.warnings_cache[key])
-            del self.warnings_cache[key]
-            self._save_warnings()
+        warning_count = await asyncio.to_thread(self.warning_store.clear, interaction.guild.id, member.id)
+        self._recent_warnings.pop((interaction.guild.id, member.id))
+        if warning_count:
             log.info(f"'{interaction.user}' (ID: {interaction.user.id}) cleared {warning_count} warnings for '{member}' (ID: {member.id}).")
             await interaction.response.send_message(f"✅ Cleared {warning_count} warnings for {member.mention}.", ephemeral=True)
         else:
@@ -220,8 +497,7 @@ class Moderation(commands.Cog):
             return
 
         try:
-            await member.timeout(delta, reason=reason)
-            log.info(f"'{interaction.user}' (ID: {interaction.user.id}) muted '{member}' (ID: {member.id}) for {duration}. Reason: {reason}")
+            await self._mute_member(member, delta, duration, reason, interaction.user)
             
             unmute_time = datetime.utcnow() + delta
             embed = discord.Embed(title="🔇 Member Muted", color=discord.Color.red(), timestamp=datetime.utcnow())
@@ -231,8 +507,6 @@ class Moderation(commands.Cog):
             embed.add_field(name="Reason", value=reason, inline=False)
             embed.add_field(name="Unmutes On", value=f"<t:{int(unmute_time.timestamp())}:F>", inline=False)
             await interaction.response.send_message(embed=embed)
-            
-            await self.send_dm_notification(member, "muted", reason, interaction.guild.name, duration)
         except discord.Forbidden:
             await interaction.response.send_message("❌ I don't have permission to time out this member.", ephemeral=True)
 
@@ -283,45 +557,192 @@ class Moderation(commands.Cog):
     @app_commands.describe(
         member="The member to ban", 
         reason="The reason for the ban",
-        delete_hours="How many hours of recent messages to delete (0-168, default 0)"
+        delete_hours="How many hours of recent messages to delete (0-168, default 0)",
+        duration="Unban automatically after this long (e.g. 12h, 7d); permanent if omitted"
     )
-    async def ban(self, interaction: discord.Interaction, member: discord.Member, reason: str = "No reason provided", delete_hours: app_commands.Range[int, 0, 168] = 0):
+    async def ban(self, interaction: discord.Interaction, member: discord.Member, reason: str = "No reason provided", delete_hours: app_commands.Range[int, 0, 168] = 0, duration: str = None):
         if not await self.check_hierarchy(interaction, member):
             return
-            
-        await self.send_dm_notification(member, "banned", reason, interaction.guild.name)
+
+        delta = self.parse_duration(duration) if duration else None
+        if duration and not delta:
+            await interaction.response.send_message("❌ Invalid duration format. Use 's', 'm', 'h', or 'd'. Ex: `30s`, `10m`, `5h`, `3d`.", ephemeral=True)
+            return
 
         try:
-            delete_seconds = delete_hours * 3600
-            await member.ban(reason=reason, delete_message_seconds=delete_seconds)
-            log.info(f"'{interaction.user}' (ID: {interaction.user.id}) banned '{member}' (ID: {member.id}). Reason: {reason}")
+            expires_at = await self._ban_member(member, reason, interaction.user, delta, duration, delete_hours * 3600)
             
             embed = discord.Embed(title="🔨 Member Banned", color=discord.Color.dark_red(), timestamp=datetime.utcnow())
             embed.add_field(name="Member", value=f"{member.name} ({member.id})", inline=True)
             embed.add_field(name="Moderator", value=interaction.user.mention, inline=True)
             embed.add_field(name="Messages Deleted", value=f"Last {delete_hours} hours", inline=True)
             embed.add_field(name="Reason", value=reason, inline=False)
+            if expires_at:
+                embed.add_field(name="Unbans On", value=f"<t:{int(expires_at)}:F>", inline=False)
             await interaction.response.send_message(embed=embed)
         except discord.Forbidden:
             await interaction.response.send_message("❌ I don't have permission to ban this member.", ephemeral=True)
 
+    def _select_massban_targets(self, interaction: discord.Interaction, joined_within: Optional[int],
+                                account_younger_than: Optional[timedelta], user_ids: list) -> tuple:
+        """
+        Resolves a /massban selection against the member cache. Members must
+        match every filter given; listed IDs are added on top. Returns the
+        targets and the number of members skipped for being out of reach.
+        """
+        guild = interaction.guild
+        now = discord.utils.utcnow()
+        targets = {}
+        skipped = 0
+
+        def can_ban(member: discord.Member) -> bool:
+            if member == guild.owner or member == interaction.user or member == guild.me:
+                return False
+            if member.top_role >= guild.me.top_role:
+                return False
+            return interaction.user == guild.owner or member.top_role < interaction.user.top_role
+
+        if joined_within is not None or account_younger_than is not None:
+            joined_after = now - timedelta(minutes=joined_within) if joined_within is not None else None
+            created_after = now - account_younger_than if account_younger_than is not None else None
+            for member in guild.members:
+                if member.bot:
+                    continue
+                if joined_after and (member.joined_at is None or member.joined_at < joined_after):
+                    continue
+                if created_after and member.created_at < created_after:
+                    continue
+                if can_ban(member):
+                    targets[member.id] = member
+                else:
+                    skipped += 1
+
+        for user_id in user_ids:
+            member = guild.get_member(user_id)
+            if member is None:
+                # Not in the server (anymore); banning by ID still keeps them out.
+                targets.setdefault(user_id, discord.Object(id=user_id))
+            elif can_ban(member):
+                targets.setdefault(user_id, member)
+            else:
+                skipped += 1
+        return list(targets.values()), skipped
+
+    @app_commands.checks.has_permissions(ban_members=True, manage_guild=True)
+    @app_commands.command(name="massban", description="Ban many accounts at once, e.g. after a raid.")
+    @app_commands.describe(
+        joined_within="Ban members who joined in the last N minutes",
+        account_younger_than="Ban members whose account is younger than this (e.g. 1h, 2d)",
+        user_ids="IDs of users to ban, separated by spaces or commas",
+        reason="The reason for the bans",
+        delete_hours="How many hours of recent messages to delete (0-168, default 0)",
+        dry_run="Only preview who would be banned"
+    )
+    async def massban(
+        self,
+        interaction: discord.Interaction,
+        joined_within: app_commands.Range[int, 1, 10080] = None,
+        account_younger_than: str = None,
+        user_ids: str = None,
+        reason: str = "Mass ban",
+        delete_hours: app_commands.Range[int, 0, 168] = 0,
+        dry_run: bool = False
+    ):
+        account_age = None
+        if account_younger_than:
+            account_age = self.parse_duration(account_younger_than)
+            if account_age is None:
+                await interaction.response.send_message("❌ Invalid duration format. Use 's', 'm', 'h', or 'd'. Ex: `30m`, `5h`, `3d`.", ephemeral=True)
+                return
+        ids = []
+        if user_ids:
+            try:
+                ids = [int(part) for part in re.split(r"[\s,]+", user_ids.strip()) if part]
+            except ValueError:
+                await interaction.response.send_message("❌ User IDs must be numbers separated by spaces or commas.", ephemeral=True)
+                return
+        if joined_within is None and account_age is None and not ids:
+            await interaction.response.send_message("❌ Give at least one of `joined_within`, `account_younger_than` or `user_ids`.", ephemeral=True)
+            return
+
+        targets, skipped = self._select_massban_targets(interaction, joined_within, account_age, ids)
+        if not targets:
+            await interaction.response.send_message(f"No accounts match this selection{f' ({skipped} out of reach)' if skipped else ''}.", ephemeral=True)
+            return
+
+        # Preview first: the first accounts, the total, and those that are out of reach.
+        preview = "\n".join(
+            f"{target.mention} ({target.id})" if isinstance(target, discord.Member) else f"<@{target.id}> ({target.id}, not in server)"
+            for target in targets[:20]
+        )
+        if len(targets) > 20:
+            preview += f"\n... and {len(targets) - 20} more"
+        embed = discord.Embed(
+            title=f"🔨 Mass Ban {'Preview' if dry_run else 'Confirmation'}",
+            description=preview,
+            color=discord.Color.dark_red()
+        )
+        embed.add_field(name="Accounts", value=str(len(targets)), inline=True)
+        if skipped:
+            embed.add_field(name="Skipped (role hierarchy)", value=str(skipped), inline=True)
+        embed.add_field(name="Reason", value=reason, inline=False)
+        if dry_run:
+            embed.set_footer(text="Dry run: nobody was banned.")
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+
+        view = ConfirmView(interaction.user.id)
+        await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+        await view.wait()
+        if not view.value:
+            await interaction.edit_original_response(content="Mass ban cancelled.", embed=None, view=None)
+            return
+
+        # No DMs: with hundreds of targets they would eat the request budget.
+        banned = failed = 0
+        for i in range(0, len(targets), MASSBAN_BATCH_SIZE):
+            batch = targets[i:i + MASSBAN_BATCH_SIZE]
+            try:
+                result = await interaction.guild.bulk_ban(batch, reason=f"{reason} (by {interaction.user})", delete_message_seconds=delete_hours * 3600)
+                banned += len(result.banned)
+                failed += len(result.failed)
+            except discord.Forbidden:
+                await interaction.edit_original_response(content="❌ I don't have permission to ban members.", embed=None, view=None)
+                return
+            except discord.HTTPException as e:
+                log.error(f"Mass ban batch failed in guild '{interaction.guild.name}' (ID: {interaction.guild.id}): {e}")
+                failed += len(batch)
+            await interaction.edit_original_response(content=f"🔨 Banning... {banned + failed}/{len(targets)}", embed=None, view=None)
+
+        log.info(f"'{interaction.user}' (ID: {interaction.user.id}) mass banned {banned} accounts ({failed} failed) in guild '{interaction.guild.name}' (ID: {interaction.guild.id}). Reason: {reason}")
+        embed = discord.Embed(title="🔨 Mass Ban Complete", color=discord.Color.dark_red(), timestamp=datetime.utcnow())
+        embed.add_field(name="Banned", value=str(banned), inline=True)
+        embed.add_field(name="Failed", value=str(failed), inline=True)
+        embed.add_field(name="Moderator", value=interaction.user.mention, inline=True)
+        embed.add_field(name="Reason", value=reason, inline=False)
+        await interaction.edit_original_response(content=None, embed=embed, view=None)
+
     @app_commands.checks.has_permissions(ban_members=True)
     @app_commands.command(name="unban", description="Unban a user from the server.")
-    @app_commands.describe(user_id="The ID of the user to unban", reason="The reason for the unban")
+    @app_commands.describe(user_id="The banned user (search by name or ID)", reason="The reason for the unban")
     async def unban(self, interaction: discord.Interaction, user_id: str, reason: str = "No reason provided"):
         try:
             user_id = int(user_id)
-            user = await self.bot.fetch_user(user_id)
-        except (ValueError, discord.NotFound):
-            await interaction.response.send_message("❌ Invalid user ID or user not found.", ephemeral=True)
+        except ValueError:
+            await interaction.response.send_message("❌ Invalid user ID. Pick a user from the list or paste their ID.", ephemeral=True)
             return
+        # The cached ban entry names the user; no need to fetch them first.
+        bans = self.ban_cache.peek(interaction.guild.id)
+        entry = bans.get(user_id) if bans is not None else None
+        name = entry.name if entry else str(user_id)
 
         try:
-            await interaction.guild.unban(user, reason=reason)
-            log.info(f"'{interaction.user}' (ID: {interaction.user.id}) unbanned '{user}' (ID: {user.id}). Reason: {reason}")
+            await interaction.guild.unban(discord.Object(id=user_id), reason=reason)
+            await self.timers.cancel(TIMER_UNBAN, interaction.guild.id, user_id)
+            log.info(f"'{interaction.user}' (ID: {interaction.user.id}) unbanned '{name}' (ID: {user_id}). Reason: {reason}")
             
             embed = discord.Embed(title="✅ Member Unbanned", color=discord.Color.green(), timestamp=datetime.utcnow())
-            embed.add_field(name="User", value=f"{user.name} ({user.id})", inline=True)
+            embed.add_field(name="User", value=f"{name} ({user_id})", inline=True)
             embed.add_field(name="Moderator", value=interaction.user.mention, inline=True)
             embed.add_field(name="Reason", value=reason, inline=False)
             await interaction.response.send_message(embed=embed)
@@ -330,43 +751,143 @@ class Moderation(commands.Cog):
         except discord.Forbidden:
             await interaction.response.send_message("❌ I don't have permission to unban users.", ephemeral=True)
 
+    @unban.autocomplete("user_id")
+    async def unban_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        bans = self.ban_cache.peek(interaction.guild.id)
+        if bans is None:
+            # Autocomplete has to answer within 3 seconds; large ban lists load in the background.
+            self.ban_cache.start_loading(interaction.guild)
+            return []
+        return [app_commands.Choice(name=entry.label[:100], value=str(entry.user_id)) for entry in bans.search(current)]
+
+    @commands.Cog.listener()
+    async def on_member_ban(self, guild: discord.Guild, user: Union[discord.User, discord.Member]):
+        self.ban_cache.on_ban(guild.id, user)
+
+    @commands.Cog.listener()
+    async def on_member_unban(self, guild: discord.Guild, user: discord.User):
+        self.ban_cache.on_unban(guild.id, user.id)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.ban_cache.drop(guild.id)
+
+    async def _run_purge(self, channel, amount: int, check, before: datetime, cancelled: asyncio.Event, report) -> tuple:
+        """
+        Streams the channel history and deletes up to `amount` messages matching
+        `check`. Messages younger than 14 days go in bulk chunks of 100; older
+        ones (which the bulk endpoint rejects) are deleted one by one, paced.
+        Only one chunk is held at a time, so memory stays flat however many
+        messages are purged. Returns (bulk deleted, singly deleted, scanned).
+        """
+        bulk_deleted = old_deleted = scanned = 0
+        chunk = []
+        bulk_cutoff = bulk_delete_cutoff()
+
+        async for message in channel.history(limit=None, before=before):
+            if cancelled.is_set() or bulk_deleted + old_deleted + len(chunk) >= amount:
+                break
+            scanned += 1
+            if not check(message):
+                continue
+
+            if message.created_at > bulk_cutoff:
+                chunk.append(message)
+                if len(chunk) == PURGE_CHUNK_SIZE:
+                    bulk_deleted += await delete_chunk(channel, chunk)
+                    chunk = []
+                    await report(bulk_deleted + old_deleted, scanned)
+                continue
+
+            # History is newest first, so everything from here on is too old for bulk deletes.
+            if chunk:
+                bulk_deleted += await delete_chunk(channel, chunk)
+                chunk = []
+            old_deleted += await delete_single(message)
+            await report(bulk_deleted + old_deleted, scanned)
+            await asyncio.sleep(OLD_MESSAGE_DELETE_DELAY)
+
+        if chunk and not cancelled.is_set():
+            bulk_deleted += await delete_chunk(channel, chunk)
+        return bulk_deleted, old_deleted, scanned
+
     @app_commands.checks.has_permissions(manage_messages=True)
     @app_commands.command(name="purge", description="Delete multiple messages from a channel.")
     @app_commands.describe(
-        amount="Number of messages to delete (1-100)",
+        amount=f"Number of messages to delete (1-{PURGE_MAX_AMOUNT})",
         member="Only delete messages from this member (optional)",
         reason="Reason for purging messages"
     )
-    async def purge(self, interaction: discord.Interaction, amount: app_commands.Range[int, 1, 100], member: discord.Member = None, reason: str = "No reason provided"):
-        await interaction.response.defer(ephemeral=True)
-        
+    async def purge(self, interaction: discord.Interaction, amount: app_commands.Range[int, 1, PURGE_MAX_AMOUNT], member: discord.Member = None, reason: str = "No reason provided"):
+        channel = interaction.channel
+        if channel.id in self.active_purges:
+            await interaction.response.send_message("❌ A purge is already running in this channel.", ephemeral=True)
+            return
+
         def check(message):
             if member:
                 return message.author == member
             return True
-        
+
+        cancelled = asyncio.Event()
+        self.active_purges[channel.id] = cancelled
+        view = PurgeCancelView(interaction.user.id, cancelled)
+        await interaction.response.send_message(f"🧹 Purging up to {amount} messages...", view=view, ephemeral=True)
+
+        last_report = 0.0
+
+        async def report(deleted, scanned):
+            # Edit the response at most once per PROGRESS_INTERVAL seconds.
+            nonlocal last_report
+            now = asyncio.get_running_loop().time()
+            if now - last_report >= PROGRESS_INTERVAL:
+                last_report = now
+                try:
+                    await interaction.edit_original_response(content=f"🧹 Purging... {deleted}/{amount} deleted ({scanned} messages checked).")
+                except discord.HTTPException:
+                    pass
+
+        async def finish(content):
+            # Interaction tokens expire after 15 minutes, which a long purge can outlast.
+            try:
+                await interaction.edit_original_response(content=content, view=None)
+            except discord.HTTPException as e:
+                log.warning(f"Could not report the result of a purge in #{channel.name}: {e}")
+
+        target_text = f" from {member.mention}" if member else ""
         try:
-            deleted = await interaction.channel.purge(limit=amount, check=check, before=interaction.created_at)
-            log.info(f"'{interaction.user}' (ID: {interaction.user.id}) purged {len(deleted)} messages in #{interaction.channel.name}. Reason: {reason}")
-            
-            target_text = f" from {member.mention}" if member else ""
-            await interaction.followup.send(
-                f"✅ Successfully deleted {len(deleted)} message{'s' if len(deleted) != 1 else ''}{target_text}.",
-                ephemeral=True
-            )
+            bulk_deleted, old_deleted, scanned = await self._run_purge(channel, amount, check, interaction.created_at, cancelled, report)
+            deleted = bulk_deleted + old_deleted
+            log.info(f"'{interaction.user}' (ID: {interaction.user.id}) purged {deleted} messages in #{channel.name}{' (cancelled)' if cancelled.is_set() else ''}. Reason: {reason}")
+
+            status = "⏹️ Purge cancelled" if cancelled.is_set() else "✅ Successfully deleted"
+            details = f" ({old_deleted} older than 14 days)" if old_deleted else ""
+            await finish(f"{status}: {deleted} message{'s' if deleted != 1 else ''}{target_text}{details}.")
         except discord.Forbidden:
-            await interaction.followup.send("❌ I don't have permission to delete messages in this channel.", ephemeral=True)
+            await finish("❌ I don't have permission to delete messages in this channel.")
+        finally:
+            self.active_purges.pop(channel.id, None)
+            view.stop()
 
     @app_commands.checks.has_permissions(manage_channels=True)
     @app_commands.command(name="slowmode", description="Set slowmode for a channel.")
     @app_commands.describe(
         seconds="Slowmode delay in seconds (0-21600, 0 to disable)",
-        channel="Channel to apply slowmode to (defaults to current channel)"
+        channel="Channel to apply slowmode to (defaults to current channel)",
+        duration="Restore the previous slowmode after this long (e.g. 30m, 2h)"
     )
-    async def slowmode(self, interaction: discord.Interaction, seconds: app_commands.Range[int, 0, 21600], channel: discord.TextChannel = None):
+    async def slowmode(self, interaction: discord.Interaction, seconds: app_commands.Range[int, 0, 21600], channel: discord.TextChannel = None, duration: str = None):
         target_channel = channel or interaction.channel
+
+        delta = self.parse_duration(duration) if duration else None
+        if duration and not delta:
+            await interaction.response.send_message("❌ Invalid duration format. Use 's', 'm', 'h', or 'd'. Ex: `30s`, `10m`, `5h`, `3d`.", ephemeral=True)
+            return
         
         try:
+            # If a timed slowmode is already running, its expiry still restores the original delay.
+            pending = self.timers.get(TIMER_SLOWMODE, interaction.guild.id, target_channel.id)
+            previous = pending.data["previous"] if pending else target_channel.slowmode_delay
             await target_channel.edit(slowmode_delay=seconds)
             log.info(f"'{interaction.user}' (ID: {interaction.user.id}) set slowmode to {seconds}s in #{target_channel.name}")
             
@@ -379,6 +900,12 @@ class Moderation(commands.Cog):
                 embed.add_field(name="Delay", value=f"{seconds} seconds", inline=True)
             
             embed.add_field(name="Moderator", value=interaction.user.mention, inline=True)
+            if delta:
+                expires_at = time.time() + delta.total_seconds()
+                await self.timers.schedule(TIMER_SLOWMODE, interaction.guild.id, target_channel.id, expires_at, {"previous": previous})
+                embed.add_field(name="Until", value=f"<t:{int(expires_at)}:F>", inline=False)
+            else:
+                await self.timers.cancel(TIMER_SLOWMODE, interaction.guild.id, target_channel.id)
             await interaction.response.send_message(embed=embed)
         except discord.Forbidden:
             await interaction.response.send_message("❌ I don't have permission to manage this channel.", ephemeral=True)
@@ -387,19 +914,26 @@ class Moderation(commands.Cog):
     @app_commands.command(name="lock", description="Lock a channel to prevent members from sending messages.")
     @app_commands.describe(
         channel="Channel to lock (defaults to current channel)",
-        reason="Reason for locking the channel"
+        reason="Reason for locking the channel",
+        duration="Unlock automatically after this long (e.g. 30m, 2h)"
     )
-    async def lock(self, interaction: discord.Interaction, channel: discord.TextChannel = None, reason: str = "No reason provided"):
+    async def lock(self, interaction: discord.Interaction, channel: discord.TextChannel = None, reason: str = "No reason provided", duration: str = None):
         target_channel = channel or interaction.channel
         
         if target_channel.id in self.locked_channels:
             await interaction.response.send_message("❌ This channel is already locked by the bot.", ephemeral=True)
             return
+
+        delta = self.parse_duration(duration) if duration else None
+        if duration and not delta:
+            await interaction.response.send_message("❌ Invalid duration format. Use 's', 'm', 'h', or 'd'. Ex: `30s`, `10m`, `5h`, `3d`.", ephemeral=True)
+            return
         
         try:
             everyone_role = interaction.guild.default_role
             await target_channel.set_permissions(everyone_role, send_messages=False, reason=reason)
             self.locked_channels.add(target_channel.id)
+            self._state.mark_dirty()
             
             log.info(f"'{interaction.user}' (ID: {interaction.user.id}) locked #{target_channel.name}. Reason: {reason}")
             
@@ -407,6 +941,10 @@ class Moderation(commands.Cog):
             embed.add_field(name="Channel", value=target_channel.mention, inline=True)
             embed.add_field(name="Moderator", value=interaction.user.mention, inline=True)
             embed.add_field(name="Reason", value=reason, inline=False)
+            if delta:
+                expires_at = time.time() + delta.total_seconds()
+                await self.timers.schedule(TIMER_UNLOCK, interaction.guild.id, target_channel.id, expires_at)
+                embed.add_field(name="Unlocks On", value=f"<t:{int(expires_at)}:F>", inline=False)
             await interaction.response.send_message(embed=embed)
         except discord.Forbidden:
             await interaction.response.send_message("❌ I don't have permission to manage this channel.", ephemeral=True)
@@ -426,13 +964,17 @@ class Moderation(commands.Cog):
              await interaction.response.send_message("❌ This channel does not appear to be locked.", ephemeral=True)
              if target_channel.id in self.locked_channels:
                  self.locked_channels.remove(target_channel.id) # Correct internal state
+                 self._state.mark_dirty()
+             await self.timers.cancel(TIMER_UNLOCK, interaction.guild.id, target_channel.id)
              return
         
         try:
             everyone_role = interaction.guild.default_role
             await target_channel.set_permissions(everyone_role, send_messages=None, reason=reason) # Reset to default
+            await self.timers.cancel(TIMER_UNLOCK, interaction.guild.id, target_channel.id)
             if target_channel.id in self.locked_channels:
                 self.locked_channels.remove(target_channel.id)
+                self._state.mark_dirty()
             
             log.info(f"'{interaction.user}' (ID: {interaction.user.id}) unlocked #{target_channel.name}. Reason: {reason}")
             
@@ -499,6 +1041,522 @@ class Moderation(commands.Cog):
         except discord.Forbidden:
             await interaction.response.send_message("❌ I don't have permission to manage roles for this user.", ephemeral=True)
 
+    # --- Bulk Role Jobs ---
+
+    def _role_job_embed(self, guild: discord.Guild, job: dict, done: int, rate: float, finished: bool = False,
+                        cancelled: bool = False) -> discord.Embed:
+        total = len(job["members"])
+        role = guild.get_role(job["role_id"])
+        verb = "Adding" if job["action"] == "add" else "Removing"
+        if cancelled:
+            title, color = "👥 Bulk Role Cancelled", discord.Color.red()
+        elif finished:
+            title, color = "👥 Bulk Role Finished", discord.Color.green()
+        else:
+            title, color = "👥 Bulk Role In Progress", discord.Color.blurple()
+        embed = discord.Embed(title=title, color=color, timestamp=datetime.utcnow())
+        embed.add_field(name="Role", value=f"{verb} {role.mention if role else job['role_id']}", inline=True)
+        embed.add_field(name="Progress", value=f"{done}/{total} ({done * 100 // max(total, 1)}%)", inline=True)
+        embed.add_field(name="Failed", value=str(job["failed"]), inline=True)
+        if not finished and not cancelled:
+            embed.add_field(name="Speed", value=f"{rate:.1f} members/s", inline=True)
+            if rate > 0:
+                eta = int(time.time() + (total - done) / rate)
+                embed.add_field(name="ETA", value=f"<t:{eta}:R>", inline=True)
+        embed.add_field(name="Reason", value=job["reason"], inline=False)
+        return embed
+
+    async def _run_role_job(self, guild: discord.Guild):
+        """
+        Works through a bulk role job with ROLE_JOB_WORKERS workers. The cursor
+        only moves past members whose edit has finished, so after a restart the
+        job resumes there; members already in the wanted state are skipped.
+        """
+        job = self.role_jobs[str(guild.id)]
+        role = guild.get_role(job["role_id"])
+        channel = guild.get_channel(job["channel_id"])
+        message = channel.get_partial_message(job["message_id"]) if channel else None
+        members = job["members"]
+        adding = job["action"] == "add"
+        reason = f"Bulk role by {job['moderator_id']}: {job['reason']}"
+
+        next_index = job["cursor"]
+        in_flight = set()
+        started_at = asyncio.get_running_loop().time()
+        started_from = next_index
+        last_report = 0.0
+
+        async def report(finished=False):
+            nonlocal last_report
+            now = asyncio.get_running_loop().time()
+            if message is None or (not finished and now - last_report < PROGRESS_INTERVAL):
+                return
+            last_report = now
+            done = job["cursor"]
+            rate = (done - started_from) / max(now - started_at, 1e-9)
+            try:
+                await message.edit(embed=self._role_job_embed(guild, job, done, rate, finished))
+            except discord.HTTPException:
+                pass
+
+        async def worker():
+            nonlocal next_index
+            while next_index < len(members):
+                index = next_index
+                next_index += 1
+                in_flight.add(index)
+                member = guild.get_member(members[index])
+                # Skip members who left or already have the wanted roles.
+                if member is not None and (member.get_role(role.id) is not None) != adding:
+                    try:
+                        if adding:
+                            await member.add_roles(role, reason=reason)
+                        else:
+                            await member.remove_roles(role, reason=reason)
+                    except discord.HTTPException as e:
+                        log.warning(f"Bulk role could not update '{member}' (ID: {member.id}): {e}")
+                        job["failed"] += 1
+                in_flight.discard(index)
+                job["cursor"] = min(in_flight) if in_flight else next_index
+                self._state.mark_dirty()
+                await report()
+
+        try:
+            if role is not None:
+                await asyncio.gather(*(worker() for _ in range(ROLE_JOB_WORKERS)))
+                await report(finished=True)
+                log.info(f"Bulk role job in guild '{guild.name}' (ID: {guild.id}) finished: {job['action']} '{role.name}' for {len(members)} members, {job['failed']} failed.")
+            else:
+                log.warning(f"Dropping bulk role job in guild '{guild.name}' (ID: {guild.id}): the role was deleted.")
+            self.role_jobs.pop(str(guild.id), None)
+            self._state.mark_dirty()
+        finally:
+            self._role_job_tasks.pop(guild.id, None)
+
+    async def _resume_role_jobs(self):
+        await self.bot.wait_until_ready()
+        for guild_id, job in list(self.role_jobs.items()):
+            guild = self.bot.get_guild(int(guild_id))
+            if guild is None or guild.id in self._role_job_tasks:
+                continue
+            log.info(f"Resuming bulk role job in guild '{guild.name}' (ID: {guild.id}): {job['cursor']}/{len(job['members'])} members done.")
+            self._role_job_tasks[guild.id] = asyncio.create_task(self._run_role_job(guild))
+
+    bulkrole = app_commands.Group(
+        name="bulkrole",
+        description="Add or remove a role for many members at once.",
+        guild_only=True,
+        default_permissions=discord.Permissions(manage_roles=True)
+    )
+
+    @app_commands.checks.has_permissions(manage_roles=True)
+    @bulkrole.command(name="start", description="Add or remove a role for every member matching the filters.")
+    @app_commands.describe(
+        action="Whether to add or remove the role",
+        role="The role to add or remove",
+        has_role="Only members who have this role",
+        joined_before="Only members who joined before this date (YYYY-MM-DD)",
+        include_bots="Also change bots (default: no)",
+        reason="Reason for the change"
+    )
+    @app_commands.choices(action=[
+        app_commands.Choice(name="Add", value="add"),
+        app_commands.Choice(name="Remove", value="remove")
+    ])
+    async def bulkrole_start(self, interaction: discord.Interaction, action: str, role: discord.Role, has_role: discord.Role = None,
+                             joined_before: str = None, include_bots: bool = False, reason: str = "No reason provided"):
+        guild = interaction.guild
+        if str(guild.id) in self.role_jobs:
+            await interaction.response.send_message("❌ A bulk role job is already running here. Wait for it or use `/bulkrole cancel`.", ephemeral=True)
+            return
+        if role >= interaction.user.top_role and interaction.user != guild.owner:
+            await interaction.response.send_message("❌ You cannot manage a role equal or higher than your highest role.", ephemeral=True)
+            return
+        if role.is_bot_managed() or role.is_premium_subscriber() or role.is_integration() or role.is_default():
+            await interaction.response.send_message(f"❌ Cannot manage the role {role.mention} as it is managed by an integration or is a default role.", ephemeral=True)
+            return
+        if role >= guild.me.top_role:
+            await interaction.response.send_message("❌ I cannot manage a role equal or higher than my highest role.", ephemeral=True)
+            return
+
+        cutoff = None
+        if joined_before:
+            try:
+                cutoff = datetime.strptime(joined_before, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+            except ValueError:
+                await interaction.response.send_message("❌ Invalid date. Use the format `YYYY-MM-DD`.", ephemeral=True)
+                return
+
+        # Resolved once from the member cache; members already in the wanted state are left out.
+        adding = action == "add"
+        candidates = has_role.members if has_role is not None else guild.members
+        targets = sorted(
+            m.id for m in candidates
+            if (include_bots or not m.bot)
+            and (cutoff is None or (m.joined_at is not None and m.joined_at < cutoff))
+            and (m.get_role(role.id) is not None) != adding
+        )
+        if not targets:
+            await interaction.response.send_message("❌ No members match those filters (or they all already have the change).", ephemeral=True)
+            return
+
+        job = self.role_jobs[str(guild.id)] = {
+            "action": action,
+            "role_id": role.id,
+            "reason": reason,
+            "moderator_id": interaction.user.id,
+            "members": targets,
+            "cursor": 0,
+            "failed": 0,
+            "channel_id": interaction.channel.id,
+            "message_id": None,
+        }
+        # The progress embed is a normal message: interaction responses can
+        # only be edited for 15 minutes, and a job may outlive a restart.
+        await interaction.response.send_message(embed=self._role_job_embed(guild, job, 0, 0.0))
+        job["message_id"] = (await interaction.original_response()).id
+        self._state.mark_dirty()
+        await self._state.flush()
+        log.info(f"'{interaction.user}' (ID: {interaction.user.id}) started a bulk role job in guild '{guild.name}' (ID: {guild.id}): {action} '{role.name}' for {len(targets)} members. Reason: {reason}")
+        self._role_job_tasks[guild.id] = asyncio.create_task(self._run_role_job(guild))
+
+    @app_commands.checks.has_permissions(manage_roles=True)
+    @bulkrole.command(name="cancel", description="Stop the running bulk role job.")
+    async def bulkrole_cancel(self, interaction: discord.Interaction):
+        guild = interaction.guild
+        job = self.role_jobs.pop(str(guild.id), None)
+        if job is None:
+            await interaction.response.send_message("❌ No bulk role job is running.", ephemeral=True)
+            return
+        task = self._role_job_tasks.pop(guild.id, None)
+        if task is not None:
+            # Wait for the workers to stop, so the cursor is final and no progress edit lands after ours.
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        self._state.mark_dirty()
+        log.info(f"'{interaction.user}' (ID: {interaction.user.id}) cancelled the bulk role job in guild '{guild.name}' (ID: {guild.id}) at {job['cursor']}/{len(job['members'])}.")
+        await interaction.response.send_message(f"✅ Bulk role job cancelled after {job['cursor']}/{len(job['members'])} members.")
+
+        # Mark the progress embed as cancelled, with the final count.
+        channel = guild.get_channel(job["channel_id"])
+        if channel is not None and job["message_id"] is not None:
+            try:
+                await channel.get_partial_message(job["message_id"]).edit(embed=self._role_job_embed(guild, job, job["cursor"], 0.0, cancelled=True))
+            except discord.HTTPException:
+                pass
+
+    # --- Lockdown ---
+
+    @staticmethod
+    def _snapshot_overwrite(channel, role) -> dict:
+        """Records a channel's overwrite for a role, including whether it had one at all."""
+        allow, deny = channel.overwrites_for(role).pair()
+        return {"existed": role in channel.overwrites, "allow": allow.value, "deny": deny.value}
+
+    @staticmethod
+    def _overwrite_from_snapshot(snapshot: dict) -> discord.PermissionOverwrite:
+        return discord.PermissionOverwrite.from_pair(discord.Permissions(snapshot["allow"]), discord.Permissions(snapshot["deny"]))
+
+    async def _apply_lockdown(self, guild: discord.Guild, lock: bool, progress=None) -> list:
+        """
+        Locks (or restores) every channel of a guild's lockdown that is not done
+        yet, using LOCKDOWN_WORKERS concurrent workers. Each finished channel is
+        recorded, so an interrupted run picks up where it stopped. Returns the
+        channels that could not be edited; they are not recorded as done, so
+        the next run tries them again.
+        """
+        lockdown = self.lockdowns[str(guild.id)]
+        done = set(lockdown["done"])
+        queue = asyncio.Queue()
+        for channel_id in lockdown["channels"]:
+            if channel_id not in done:
+                queue.put_nowait(channel_id)
+        role = guild.default_role
+        reason = f"Lockdown {'enabled' if lock else 'lifted'}: {lockdown['reason']}"
+        failed = []
+
+        async def worker():
+            while not queue.empty():
+                channel_id = queue.get_nowait()
+                channel = guild.get_channel(int(channel_id))
+                if channel is not None:
+                    snapshot = lockdown["channels"][channel_id]
+                    try:
+                        if lock:
+                            overwrite = self._overwrite_from_snapshot(snapshot)
+                            overwrite.update(**LOCKDOWN_DENY)
+                            await channel.set_permissions(role, overwrite=overwrite, reason=reason)
+                        else:
+                            # Put back exactly what was there, including no overwrite at all.
+                            overwrite = self._overwrite_from_snapshot(snapshot) if snapshot["existed"] else None
+                            await channel.set_permissions(role, overwrite=overwrite, reason=reason)
+                    except discord.HTTPException as e:
+                        log.warning(f"Lockdown could not edit #{channel.name} (ID: {channel.id}): {e}")
+                        failed.append(channel)
+                        continue
+                lockdown["done"].append(channel_id)
+                self._state.mark_dirty()
+                if progress:
+                    await progress(len(lockdown["done"]), len(lockdown["channels"]))
+
+        await asyncio.gather(*(worker() for _ in range(LOCKDOWN_WORKERS)))
+        return failed
+
+    async def _run_lockdown(self, guild: discord.Guild, lock: bool, progress=None) -> list:
+        """Runs one lockdown phase to the end and moves the lockdown to its next state."""
+        lockdown = self.lockdowns[str(guild.id)]
+        try:
+            failed = await self._apply_lockdown(guild, lock, progress)
+            if lock:
+                lockdown["state"] = "locked"
+                lockdown["done"] = []
+            elif failed:
+                # Keep the snapshots of the channels still locked, so the lift can be retried.
+                log.warning(f"Lockdown lift in guild '{guild.name}' (ID: {guild.id}) left {len(failed)} channels locked.")
+            else:
+                del self.lockdowns[str(guild.id)]
+            self._state.mark_dirty()
+            return failed
+        finally:
+            self._lockdown_tasks.pop(guild.id, None)
+
+    async def _resume_lockdowns(self):
+        await self.bot.wait_until_ready()
+        for guild_id, lockdown in list(self.lockdowns.items()):
+            guild = self.bot.get_guild(int(guild_id))
+            if guild is None or lockdown["state"] == "locked" or guild.id in self._lockdown_tasks:
+                continue
+            lock = lockdown["state"] == "locking"
+            log.info(f"Resuming lockdown {'enforcement' if lock else 'lift'} in guild '{guild.name}' (ID: {guild.id}): {len(lockdown['done'])}/{len(lockdown['channels'])} channels done.")
+            task = self._lockdown_tasks[guild.id] = asyncio.create_task(self._run_lockdown(guild, lock))
+            await task
+
+    async def _lockdown_with_progress(self, interaction: discord.Interaction, lock: bool) -> list:
+        last_report = 0.0
+        verb = "Locking" if lock else "Unlocking"
+
+        async def progress(done, total):
+            nonlocal last_report
+            now = asyncio.get_running_loop().time()
+            if now - last_report >= PROGRESS_INTERVAL:
+                last_report = now
+                try:
+                    await interaction.edit_original_response(content=f"{verb} channels... {done}/{total}")
+                except discord.HTTPException:
+                    pass
+
+        task = asyncio.create_task(self._run_lockdown(interaction.guild, lock, progress))
+        self._lockdown_tasks[interaction.guild.id] = task
+        return await task
+
+    lockdown = app_commands.Group(
+        name="lockdown",
+        description="Lock every text channel of the server at once.",
+        guild_only=True,
+        default_permissions=discord.Permissions(manage_channels=True)
+    )
+
+    @app_commands.checks.has_permissions(manage_channels=True)
+    @lockdown.command(name="start", description="Stop @everyone from sending messages in every text channel.")
+    @app_commands.describe(reason="Reason for the lockdown")
+    async def lockdown_start(self, interaction: discord.Interaction, reason: str = "No reason provided"):
+        guild = interaction.guild
+        if str(guild.id) in self.lockdowns:
+            await interaction.response.send_message("❌ This server is already in lockdown (or one is being lifted).", ephemeral=True)
+            return
+
+        await interaction.response.defer(thinking=True)
+        role = guild.default_role
+        # Snapshot every channel and save the snapshots before touching anything,
+        # so the lift can restore them even if the bot stops halfway.
+        self.lockdowns[str(guild.id)] = {
+            "state": "locking",
+            "reason": reason,
+            "channels": {str(channel.id): self._snapshot_overwrite(channel, role) for channel in guild.text_channels},
+            "done": [],
+        }
+        self._state.mark_dirty()
+        await self._state.flush()
+
+        failed = await self._lockdown_with_progress(interaction, lock=True)
+        total = len(self.lockdowns[str(guild.id)]["channels"])
+        log.info(f"'{interaction.user}' (ID: {interaction.user.id}) locked down guild '{guild.name}' (ID: {guild.id}), {total - len(failed)}/{total} channels. Reason: {reason}")
+
+        embed = discord.Embed(title="🚨 Server Lockdown", color=discord.Color.dark_red(), timestamp=datetime.utcnow())
+        embed.add_field(name="Channels Locked", value=f"{total - len(failed)}/{total}", inline=True)
+        embed.add_field(name="Moderator", value=interaction.user.mention, inline=True)
+        embed.add_field(name="Reason", value=reason, inline=False)
+        if failed:
+            embed.add_field(name="Could Not Lock", value=" ".join(channel.mention for channel in failed)[:1024], inline=False)
+        await interaction.edit_original_response(content=None, embed=embed)
+
+    @app_commands.checks.has_permissions(manage_channels=True)
+    @lockdown.command(name="lift", description="End the lockdown and restore every channel's previous permissions.")
+    @app_commands.describe(reason="Reason for lifting the lockdown")
+    async def lockdown_lift(self, interaction: discord.Interaction, reason: str = "No reason provided"):
+        guild = interaction.guild
+        lockdown = self.lockdowns.get(str(guild.id))
+        if lockdown is None:
+            await interaction.response.send_message("❌ This server is not in lockdown.", ephemeral=True)
+            return
+        if guild.id in self._lockdown_tasks:
+            await interaction.response.send_message("❌ The lockdown is still being applied or lifted. Try again in a moment.", ephemeral=True)
+            return
+
+        await interaction.response.defer(thinking=True)
+        if lockdown["state"] != "lifting":
+            # Restore every channel, including any a half-finished lockdown did reach.
+            # Retrying a partial lift only restores the channels still left.
+            lockdown["state"] = "lifting"
+            lockdown["done"] = []
+        lockdown["reason"] = reason
+        self._state.mark_dirty()
+        await self._state.flush()
+
+        total = len(lockdown["channels"])
+        failed = await self._lockdown_with_progress(interaction, lock=False)
+        log.info(f"'{interaction.user}' (ID: {interaction.user.id}) lifted the lockdown in guild '{guild.name}' (ID: {guild.id}), {total - len(failed)}/{total} channels. Reason: {reason}")
+
+        if failed:
+            embed = discord.Embed(title="⚠️ Lockdown Partly Lifted", color=discord.Color.orange(), timestamp=datetime.utcnow())
+        else:
+            embed = discord.Embed(title="✅ Lockdown Lifted", color=discord.Color.green(), timestamp=datetime.utcnow())
+        embed.add_field(name="Channels Restored", value=f"{total - len(failed)}/{total}", inline=True)
+        embed.add_field(name="Moderator", value=interaction.user.mention, inline=True)
+        embed.add_field(name="Reason", value=reason, inline=False)
+        if failed:
+            embed.add_field(name="Still Locked", value=" ".join(channel.mention for channel in failed)[:1024], inline=False)
+            embed.set_footer(text="Run /lockdown lift again to retry these channels.")
+        await interaction.edit_original_response(content=None, embed=embed)
+
+    # --- Warning Escalation ---
+
+    escalation = app_commands.Group(
+        name="escalation",
+        description="Mute or ban members automatically when warnings pile up.",
+        guild_only=True,
+        default_permissions=discord.Permissions(manage_guild=True)
+    )
+
+    @app_commands.checks.has_permissions(manage_guild=True)
+    @escalation.command(name="set", description="Add or replace the step for a number of warnings.")
+    @app_commands.describe(
+        warnings="Number of warnings that triggers this step",
+        days="Only warnings from the last this many days count",
+        action="What to do when the step is reached",
+        duration="Mute length (required, max 28d), or temporary ban length (omit for a permanent ban)"
+    )
+    @app_commands.choices(action=[app_commands.Choice(name=name.title(), value=name) for name in ACTIONS])
+    async def escalation_set(self, interaction: discord.Interaction, warnings: app_commands.Range[int, 1, 50],
+                             days: app_commands.Range[int, 1, 365], action: app_commands.Choice[str], duration: str = None):
+        delta = self.parse_duration(duration) if duration else None
+        if duration and not delta:
+            await interaction.response.send_message("❌ Invalid duration format. Use 's', 'm', 'h', or 'd'. Ex: `30s`, `10m`, `5h`, `3d`.", ephemeral=True)
+            return
+        if action.value == ESCALATE_MUTE and (delta is None or delta > timedelta(days=28)):
+            await interaction.response.send_message("❌ Mute steps need a duration of at most 28 days.", ephemeral=True)
+            return
+
+        step = EscalationStep(warnings, days * 86400, action.value, duration)
+        policy = self.escalation.get(interaction.guild.id, EscalationPolicy())
+        self.escalation[interaction.guild.id] = policy.with_step(step)
+        # Warns issued while the guild had no policy were not recorded in the cache.
+        self._recent_warnings.clear()
+        self._state.mark_dirty()
+        log.info(f"'{interaction.user}' (ID: {interaction.user.id}) set escalation step {step} in guild {interaction.guild.id}.")
+        await interaction.response.send_message(
+            f"✅ {warnings} warnings within {self._format_window(step.window)} now lead to: **{self._describe_step(step)}**.", ephemeral=True
+        )
+
+    @app_commands.checks.has_permissions(manage_guild=True)
+    @escalation.command(name="remove", description="Remove the step for a number of warnings.")
+    @app_commands.describe(warnings="The warning count of the step to remove")
+    async def escalation_remove(self, interaction: discord.Interaction, warnings: app_commands.Range[int, 1, 50]):
+        policy = self.escalation.get(interaction.guild.id, EscalationPolicy())
+        if not any(step.warnings == warnings for step in policy.steps):
+            await interaction.response.send_message(f"❌ There is no step for {warnings} warnings.", ephemeral=True)
+            return
+        self.escalation[interaction.guild.id] = policy.without_step(warnings)
+        self._state.mark_dirty()
+        await interaction.response.send_message(f"✅ Removed the step for {warnings} warnings.", ephemeral=True)
+
+    @app_commands.checks.has_permissions(manage_guild=True)
+    @escalation.command(name="show", description="Show this server's escalation steps.")
+    async def escalation_show(self, interaction: discord.Interaction):
+        policy = self.escalation.get(interaction.guild.id)
+        if not policy:
+            await interaction.response.send_message("No escalation steps are set. Add one with `/escalation set`.", ephemeral=True)
+            return
+        embed = discord.Embed(title="📈 Warning Escalation", color=discord.Color.orange())
+        embed.description = "\n".join(
+            f"**{step.warnings}** warnings in {self._format_window(step.window)} → {self._describe_step(step)}"
+            for step in policy.steps
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @staticmethod
+    def _describe_step(step: EscalationStep) -> str:
+        if step.action == ESCALATE_MUTE:
+            return f"mute for {step.duration}"
+        return f"ban for {step.duration}" if step.duration else "permanent ban"
+
+    # --- Moderator Statistics ---
+
+    modstats = app_commands.Group(
+        name="modstats",
+        description="Query the warning history of this server.",
+        guild_only=True,
+        default_permissions=discord.Permissions(manage_messages=True)
+    )
+
+    @app_commands.checks.has_permissions(manage_messages=True)
+    @modstats.command(name="moderator", description="List the warnings a moderator issued recently.")
+    @app_commands.describe(moderator="The moderator to look up", days="How many days back to look (default 7)")
+    async def modstats_moderator(self, interaction: discord.Interaction, moderator: discord.Member, days: app_commands.Range[int, 1, 365] = 7):
+        since = int((datetime.utcnow() - timedelta(days=days)).timestamp())
+
+        async def fetch(before_id, limit):
+            return await asyncio.to_thread(self.warning_store.by_moderator, interaction.guild.id, moderator.id, since, limit, before_id)
+
+        def render(warnings_list, page):
+            embed = discord.Embed(
+                title=f"Warnings issued by {moderator.display_name}",
+                description=f"Last {days} day{'s' if days != 1 else ''}",
+                color=discord.Color.orange(),
+                timestamp=datetime.utcnow()
+            )
+            for w in warnings_list:
+                embed.add_field(
+                    name=f"<t:{w.timestamp}:D>",
+                    value=f"**Member:** <@{w.member_id}>\n**Reason:** {w.reason}",
+                    inline=False
+                )
+            embed.set_footer(text=f"Page {page}")
+            return embed
+
+        view = WarningPages(interaction.user.id, fetch, render)
+        embed = await view.load()
+        if not view.page:
+            await interaction.response.send_message(f"{moderator.mention} issued no warnings in the last {days} days.", ephemeral=True)
+            return
+        await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+
+    @app_commands.checks.has_permissions(manage_messages=True)
+    @modstats.command(name="top", description="Show the most warned members of this server.")
+    @app_commands.describe(limit="How many members to show (default 10)")
+    async def modstats_top(self, interaction: discord.Interaction, limit: app_commands.Range[int, 1, 25] = 10):
+        top = await asyncio.to_thread(self.warning_store.top_members, interaction.guild.id, limit)
+        if not top:
+            await interaction.response.send_message("No one in this server has been warned.", ephemeral=True)
+            return
+
+        embed = discord.Embed(title="⚠️ Most Warned Members", color=discord.Color.orange(), timestamp=datetime.utcnow())
+        embed.description = "\n".join(
+            f"**{rank}.** <@{member_id}> — {count} warning{'s' if count != 1 else ''}"
+            for rank, (member_id, count) in enumerate(top, start=1)
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
     # --- Info Commands ---
 
     @app_commands.command(name="userinfo", description="Shows information about a user.")
@@ -535,8 +1593,7 @@ class Moderation(commands.Cog):
             )
         
             # Warnings count
-            key = self._get_warnings_key(interaction.guild.id, target.id)
-            warning_count = len(self.warnings_cache.get(key, []))
+            warning_count = await asyncio.to_thread(self.warning_store.count, interaction.guild.id, target.id)
             embed.add_field(name="Warnings", value=str(warning_count), inline=True)
             
             # Status info
@@ -561,8 +1618,14 @@ class Moderation(commands.Cog):
         embed.add_field(name="Owner", value=guild.owner.mention, inline=True)
         embed.add_field(name="Created On", value=f"<t:{int(guild.created_at.timestamp())}:F>", inline=True)
         
-        humans = len([m for m in guild.members if not m.bot])
-        bots = guild.member_count - humans
+        # Kept up to date from member events by the MemberCounts cog, so no member scan here.
+        counters = self.bot.get_cog("MemberCounts")
+        if counters is not None:
+            counts = counters.get(guild)
+            humans, bots = counts.humans, counts.bots
+        else:
+            humans = len([m for m in guild.members if not m.bot])
+            bots = guild.member_count - humans
         embed.add_field(name="Members", value=f"**Total:** {guild.member_count}\n"
                                              f"**Humans:** {humans}\n"
                                              f"**Bots:** {bots}", inline=True)
@@ -572,7 +1635,10 @@ class Moderation(commands.Cog):
                                                f"**Stages:** {len(guild.stage_channels)}", inline=True)
                                                
         embed.add_field(name="Roles", value=str(len(guild.roles)), inline=True)
-        embed.add_field(name="Boosts", value=f"**Level {guild.premium_tier}** ({guild.premium_subscription_count} boosts)", inline=True)
+        boosts = f"**Level {guild.premium_tier}** ({guild.premium_subscription_count} boosts)"
+        if counters is not None:
+            boosts += f"\n**Boosters:** {counts.boosters}"
+        embed.add_field(name="Boosts", value=boosts, inline=True)
         
         embed.set_footer(text=f"Server ID: {guild.id}")
         await interaction.response.send_message(embed=embed)
@@ -2,6 +2,7 @@ import os
 import discord
 from discord.ext import commands
 import asyncio
+import signal
 from flask import Flask
 from threading import Thread
 from dotenv import load_dotenv
@@ -47,7 +48,13 @@ async def on_ready():
 
 async def main():
     keep_alive()
-    await bot.start(TOKEN)
+    # Closing the bot unloads every cog, which lets them save pending state.
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, lambda: asyncio.create_task(bot.close()))
+    except NotImplementedError:
+        pass  # Not supported on Windows.
+    async with bot:
+        await bot.start(TOKEN)
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,37 @@
+import pytest
+
+from utils.fuzzy import DEFAULT_THRESHOLD, FuzzyIndex
+from utils.matcher import WordFilter
+from utils.normalize import fold
+from utils.wordlist import merge_sources
+
+# Everyday words that are one or two letters away from a listed word.
+COMMON_WORDS = """
+    public ahead batch hoarse canal cummings niggle brother brothers master mastering counts sucker suckers
+    analysis assassin assess assessment assistant basement bigger button butter classic cocktail cockpit
+    country counter cunning dickens document grapes passage passion peacock pickle punish scraper shuttle
+    snigger sussex therapist titanic whistle witches boxers burger chinos canals breasted
+""".split()
+
+
+@pytest.fixture(scope="module")
+def index():
+    words = merge_sources(["bad_words.json", "badworsds.txt"])
+    return FuzzyIndex(WordFilter(words).phrases)
+
+
+def test_common_words_are_not_flagged(index):
+    text = fold(" ".join(COMMON_WORDS))
+    assert list(index.finditer(text, DEFAULT_THRESHOLD)) == []
+
+
+def test_single_edit_misspellings_are_flagged():
+    index = FuzzyIndex(["cocksucker", "masterbate", "fucker"], dictionary=["fucker", "public"])
+    for token, word in [("cocksukker", "cocksucker"), ("mastrbate", "masterbate"), ("fuckker", "fucker")]:
+        assert index.search(fold(token)) == (0, len(token), word)
+
+
+def test_short_and_distant_tokens_are_not_flagged():
+    index = FuzzyIndex(["pubic", "cocksucker"], dictionary=[])
+    assert index.search("pubik") is None  # shorter than MIN_TOKEN_LENGTH
+    assert index.search("cocksukkar") is None  # two edits away
@@ -0,0 +1,53 @@
+import asyncio
+import json
+import threading
+import time
+
+from utils import persistence
+from utils.persistence import WriteBehindFile
+
+
+def _read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_change_marked_during_a_write_is_saved(tmp_path, monkeypatch):
+    path = str(tmp_path / "state.json")
+    writing = threading.Event()
+    real_write = persistence.write_json_atomic
+
+    def slow_write(path, data):
+        writing.set()
+        time.sleep(0.2)
+        real_write(path, data)
+
+    monkeypatch.setattr(persistence, "write_json_atomic", slow_write)
+
+    async def main():
+        state = {"v": 1}
+        saved = WriteBehindFile(path, lambda: dict(state), delay=0.01)
+        saved.mark_dirty()
+        await asyncio.to_thread(writing.wait, 1)
+
+        # The first write is still running; this change must not wait for another mark_dirty().
+        state["v"] = 2
+        saved.mark_dirty()
+        await asyncio.sleep(0.6)
+        return _read(path)
+
+    assert asyncio.run(main()) == {"v": 2}
+
+
+def test_close_writes_pending_changes(tmp_path):
+    path = str(tmp_path / "state.json")
+
+    async def main():
+        state = {"v": 1}
+        saved = WriteBehindFile(path, lambda: dict(state), delay=60)
+        saved.mark_dirty()
+        state["v"] = 2
+        await saved.close()
+
+    asyncio.run(main())
+    assert _read(path) == {"v": 2}
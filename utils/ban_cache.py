@@ -0,0 +1,150 @@
+"""
+Per-guild ban lists for /unban, with prefix search for autocomplete.
+
+A guild's bans are fetched once, page by page, the first time they are
+needed, then kept current from ban and unban events. Each ban is indexed
+under the user's name, global (display) name and ID in a sorted list, so
+a prefix lookup is a bisect plus a short walk instead of a scan.
+"""
+import asyncio
+import logging
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import discord
+
+log = logging.getLogger(__name__)
+
+
+class BanEntry(NamedTuple):
+    user_id: int
+    name: str
+    global_name: Optional[str]
+    reason: Optional[str]
+
+    @property
+    def label(self) -> str:
+        if self.global_name and self.global_name != self.name:
+            return f"{self.global_name} (@{self.name}, {self.user_id})"
+        return f"@{self.name} ({self.user_id})"
+
+
+class BanList:
+    """The bans of one guild, indexed by lowercased name, global name and ID."""
+
+    def __init__(self):
+        self.entries: Dict[int, BanEntry] = {}
+        self._index: List[tuple] = []  # sorted (search key, user_id)
+
+    @classmethod
+    def from_bans(cls, bans: Iterable[Tuple[discord.abc.User, Optional[str]]]) -> "BanList":
+        """Builds a ban list from (user, reason) pairs, sorting the index once."""
+        ban_list = cls()
+        for user, reason in bans:
+            ban_list.entries[user.id] = cls._entry(user, reason)
+        ban_list._index = sorted(
+            (key, entry.user_id) for entry in ban_list.entries.values() for key in cls._keys(entry)
+        )
+        return ban_list
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, user_id: int) -> Optional[BanEntry]:
+        return self.entries.get(user_id)
+
+    @staticmethod
+    def _keys(entry: BanEntry) -> set:
+        keys = {entry.name.lower(), str(entry.user_id)}
+        if entry.global_name:
+            keys.add(entry.global_name.lower())
+        return keys
+
+    @staticmethod
+    def _entry(user: discord.abc.User, reason: Optional[str]) -> BanEntry:
+        return BanEntry(user.id, user.name, getattr(user, "global_name", None), reason)
+
+    def add(self, user: discord.abc.User, reason: Optional[str] = None):
+        """Adds one ban (from a ban event), keeping the index sorted."""
+        self.remove(user.id)
+        entry = self._entry(user, reason)
+        self.entries[user.id] = entry
+        for key in self._keys(entry):
+            insort(self._index, (key, user.id))
+
+    def remove(self, user_id: int):
+        entry = self.entries.pop(user_id, None)
+        if entry is None:
+            return
+        for key in self._keys(entry):
+            i = bisect_left(self._index, (key, user_id))
+            if i < len(self._index) and self._index[i] == (key, user_id):
+                del self._index[i]
+
+    def search(self, prefix: str, limit: int = 25) -> List[BanEntry]:
+        """Returns up to `limit` bans whose name, global name or ID starts with `prefix` (case-insensitive)."""
+        prefix = prefix.strip().lower()
+        found: Dict[int, BanEntry] = {}
+        i = bisect_left(self._index, (prefix,))
+        while i < len(self._index) and len(found) < limit:
+            key, user_id = self._index[i]
+            if not key.startswith(prefix):
+                break
+            found.setdefault(user_id, self.entries[user_id])
+            i += 1
+        return list(found.values())
+
+
+class BanCache:
+    """BanLists per guild, loaded lazily from the API."""
+
+    def __init__(self):
+        self._lists: Dict[int, BanList] = {}
+        self._loading: Dict[int, asyncio.Task] = {}
+
+    def peek(self, guild_id: int) -> Optional[BanList]:
+        """Returns a guild's ban list if it has been loaded."""
+        return self._lists.get(guild_id)
+
+    async def get(self, guild: discord.Guild) -> BanList:
+        """Returns a guild's ban list, loading it first if needed (concurrent callers share one load)."""
+        bans = self._lists.get(guild.id)
+        if bans is not None:
+            return bans
+        task = self._loading.get(guild.id)
+        if task is None:
+            task = self._loading[guild.id] = asyncio.create_task(self._load(guild))
+        return await asyncio.shield(task)
+
+    def start_loading(self, guild: discord.Guild):
+        """Starts loading a guild's ban list in the background, if it isn't loaded or loading."""
+        if guild.id not in self._lists and guild.id not in self._loading:
+            self._loading[guild.id] = asyncio.create_task(self._load(guild))
+
+    async def _load(self, guild: discord.Guild) -> BanList:
+        try:
+            # guild.bans pages through the ban list 1000 entries at a time.
+            fetched = [(ban.user, ban.reason) async for ban in guild.bans(limit=None)]
+        except discord.HTTPException as e:
+            # Not cached, so the next lookup tries again.
+            log.warning("Could not load the bans of guild %s: %s", guild.id, e)
+            return BanList()
+        finally:
+            self._loading.pop(guild.id, None)
+        bans = BanList.from_bans(fetched)
+        self._lists[guild.id] = bans
+        log.info("Loaded %d bans for guild %s.", len(bans), guild.id)
+        return bans
+
+    def on_ban(self, guild_id: int, user: discord.abc.User):
+        bans = self._lists.get(guild_id)
+        if bans is not None:
+            bans.add(user)
+
+    def on_unban(self, guild_id: int, user_id: int):
+        bans = self._lists.get(guild_id)
+        if bans is not None:
+            bans.remove(user_id)
+
+    def drop(self, guild_id: int):
+        self._lists.pop(guild_id, None)
@@ -0,0 +1,76 @@
+"""
+Deleting many messages of one channel, shared by /purge and AutoMod.
+
+The bulk-delete endpoint takes 2-100 messages per call, all younger than
+14 days; if any message is older the whole call fails with a 400. Older
+messages therefore go through single deletes instead.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Sequence
+
+import discord
+
+log = logging.getLogger(__name__)
+
+BULK_DELETE_LIMIT = 100
+BULK_DELETE_MAX_AGE = timedelta(days=14)
+
+
+def bulk_delete_cutoff() -> datetime:
+    """Messages created after this can be bulk-deleted (with a minute of margin, so none ages past it mid-request)."""
+    return discord.utils.utcnow() - BULK_DELETE_MAX_AGE + timedelta(minutes=1)
+
+
+async def delete_single(message: discord.Message) -> bool:
+    """Deletes one message; returns False if it was already gone or could not be deleted."""
+    try:
+        await message.delete()
+        return True
+    except discord.NotFound:
+        return False
+    except discord.Forbidden:
+        raise
+    except discord.HTTPException as e:
+        # Don't let one failed delete stop the rest of the batch.
+        log.warning("Could not delete message %s in channel %s: %s", message.id, message.channel.id, e)
+        return False
+
+
+async def delete_chunk(channel, chunk: Sequence[discord.Message]) -> int:
+    """
+    Bulk-deletes up to 100 messages younger than the bulk cutoff. If the
+    call fails (one is already gone, or aged past the limit), deletes them
+    one by one instead. Returns how many were deleted.
+    """
+    try:
+        await channel.delete_messages(chunk)
+        return len(chunk)
+    except discord.Forbidden:
+        raise
+    except discord.HTTPException:
+        deleted = 0
+        for message in chunk:
+            deleted += await delete_single(message)
+        return deleted
+
+
+async def delete_messages(channel, messages: Sequence[discord.Message], old_message_delay: float = 0.0) -> int:
+    """
+    Deletes messages of one channel: those young enough in bulk chunks, the
+    rest one by one, `old_message_delay` seconds apart. Returns how many
+    were deleted.
+    """
+    cutoff = bulk_delete_cutoff()
+    young = [m for m in messages if m.created_at > cutoff]
+    old = [m for m in messages if m.created_at <= cutoff]
+
+    deleted = 0
+    for i in range(0, len(young), BULK_DELETE_LIMIT):
+        deleted += await delete_chunk(channel, young[i:i + BULK_DELETE_LIMIT])
+    for n, message in enumerate(old):
+        if n and old_message_delay:
+            await asyncio.sleep(old_message_delay)
+        deleted += await delete_single(message)
+    return deleted
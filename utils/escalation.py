@@ -0,0 +1,76 @@
+"""
+Warning escalation policies, e.g. "3 warnings in 7 days -> 1h timeout,
+5 warnings in 30 days -> ban".
+
+A policy is evaluated against the timestamps of a member's most recent
+warnings, keeping no more of them than its largest threshold. Those act
+as decaying counters: a step's count is the number of timestamps inside
+its window, which drops as warnings age out. Evaluating a warn is one
+bisect per step, whatever the length of the member's history.
+"""
+from bisect import bisect_left
+from typing import Iterable, List, NamedTuple, Optional, Sequence
+
+ESCALATE_MUTE = "mute"
+ESCALATE_BAN = "ban"
+ACTIONS = (ESCALATE_MUTE, ESCALATE_BAN)
+
+
+class EscalationStep(NamedTuple):
+    warnings: int  # Warnings needed inside the window
+    window: int  # Seconds
+    action: str  # ESCALATE_MUTE or ESCALATE_BAN
+    duration: Optional[str]  # e.g. "1h": the mute length, or a temporary ban; None for a permanent ban
+
+    @property
+    def severity(self) -> tuple:
+        return self.action == ESCALATE_BAN, self.warnings
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "EscalationStep":
+        return cls(data["warnings"], data["window"], data["action"], data.get("duration"))
+
+
+class EscalationPolicy:
+    """The escalation steps of one guild, at most one per warning threshold."""
+
+    def __init__(self, steps: Iterable[EscalationStep] = ()):
+        by_threshold = {step.warnings: step for step in steps}
+        self.steps: List[EscalationStep] = [by_threshold[n] for n in sorted(by_threshold)]
+
+    def __bool__(self) -> bool:
+        return bool(self.steps)
+
+    @property
+    def depth(self) -> int:
+        """How many recent warning timestamps evaluation needs."""
+        return max((step.warnings for step in self.steps), default=0)
+
+    def with_step(self, step: EscalationStep) -> "EscalationPolicy":
+        return EscalationPolicy(self.steps + [step])
+
+    def without_step(self, warnings: int) -> "EscalationPolicy":
+        return EscalationPolicy(s for s in self.steps if s.warnings != warnings)
+
+    def evaluate(self, timestamps: Sequence[int], now: int) -> Optional[EscalationStep]:
+        """
+        Returns the most severe step reached (a ban beats any mute, then the
+        higher threshold wins), given the member's recent warning timestamps
+        in ascending order.
+        """
+        reached = None
+        for step in self.steps:
+            count = len(timestamps) - bisect_left(timestamps, now - step.window)
+            if count >= step.warnings and (reached is None or step.severity > reached.severity):
+                reached = step
+        return reached
+
+    def to_list(self) -> list:
+        return [step.to_dict() for step in self.steps]
+
+    @classmethod
+    def from_list(cls, data: list) -> "EscalationPolicy":
+        return cls(EscalationStep.from_dict(step) for step in data)
@@ -0,0 +1,119 @@
+"""
+Per-member flood detection for AutoMod.
+
+Every (guild, member) pair gets a small fixed-size record: a ring buffer of
+recent message times, a token bucket for mentions and a counter for
+repeated lines. Checking a message touches only that record, so the cost
+per message is constant, and records of members who went quiet are
+evicted so memory stays bounded even in very large guilds.
+"""
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Hashable, Optional
+
+# Rule names reported by `FloodDetector.check`.
+FLOOD_MESSAGES = "flood_messages"
+FLOOD_MENTIONS = "flood_mentions"
+FLOOD_DUPLICATES = "flood_duplicates"
+
+
+@dataclass(frozen=True)
+class FloodLimits:
+    """Thresholds for one guild. A limit of 0 disables that check."""
+    messages: int = 6            # messages allowed ...
+    message_window: float = 5.0  # ... per this many seconds
+    mentions: int = 10           # mentions allowed ...
+    mention_window: float = 15.0  # ... per this many seconds
+    duplicates: int = 4          # identical messages in a row allowed ...
+    duplicate_window: float = 30.0  # ... within this many seconds
+
+
+class _MemberRecord:
+    __slots__ = ("times", "tokens", "refilled_at", "last_hash", "repeats", "repeat_started", "last_seen")
+
+    def __init__(self, limits: FloodLimits, now: float):
+        self.times = deque(maxlen=max(limits.messages, 1))
+        self.tokens = float(limits.mentions)
+        self.refilled_at = now
+        self.last_hash = None
+        self.repeats = 0
+        self.repeat_started = now
+        self.last_seen = now
+
+
+class FloodDetector:
+    """
+    Tracks recent activity per (guild, member) key.
+
+    Records that have been idle for `idle_after` seconds are dropped, and
+    at most `max_members` records are kept; the least recently active
+    member goes first.
+    """
+
+    def __init__(self, idle_after: float = 300.0, max_members: int = 100_000):
+        self.idle_after = idle_after
+        self.max_members = max_members
+        self._records = OrderedDict()  # key -> _MemberRecord, least recently active first
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def _evict(self, now: float):
+        records = self._records
+        while records:
+            key, record = next(iter(records.items()))
+            if len(records) <= self.max_members and now - record.last_seen < self.idle_after:
+                break
+            del records[key]
+
+    def check(self, key: Hashable, limits: FloodLimits, mentions: int = 0,
+              content_hash: Optional[int] = None, now: Optional[float] = None) -> Optional[str]:
+        """
+        Records one message for `key` and returns the flood rule it breaks,
+        or None. `content_hash` identifies the message text for the
+        duplicate check.
+        """
+        now = time.monotonic() if now is None else now
+        record = self._records.get(key)
+        if record is None:
+            record = self._records[key] = _MemberRecord(limits, now)
+        else:
+            self._records.move_to_end(key)
+        record.last_seen = now
+        self._evict(now)
+
+        verdict = None
+
+        # Messages per window: the ring buffer holds the last N timestamps, so
+        # the window is broken when the oldest of them is still recent.
+        if limits.messages:
+            times = record.times
+            if times.maxlen != limits.messages:
+                times = record.times = deque(times, maxlen=limits.messages)
+            if len(times) == limits.messages and now - times[0] < limits.message_window:
+                verdict = FLOOD_MESSAGES
+            times.append(now)
+
+        # Mentions per window: a token bucket refilled at limits/window per second.
+        if limits.mentions:
+            rate = limits.mentions / limits.mention_window
+            record.tokens = min(limits.mentions, record.tokens + (now - record.refilled_at) * rate)
+            record.refilled_at = now
+            if mentions:
+                record.tokens -= mentions
+                if record.tokens < 0 and verdict is None:
+                    verdict = FLOOD_MENTIONS
+
+        # Identical messages in a row within the window.
+        if limits.duplicates and content_hash is not None:
+            if content_hash == record.last_hash and now - record.repeat_started < limits.duplicate_window:
+                record.repeats += 1
+                if record.repeats > limits.duplicates and verdict is None:
+                    verdict = FLOOD_DUPLICATES
+            else:
+                record.last_hash = content_hash
+                record.repeats = 1
+                record.repeat_started = now
+
+        return verdict
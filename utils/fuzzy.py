@@ -0,0 +1,127 @@
+"""
+Indexed fuzzy matching for AutoMod.
+
+Comparing every token of a message against every listed word with an edit
+distance scorer is far too slow for the message hot path. `FuzzyIndex`
+keeps a character trigram inverted index over the word list instead: a
+token only looks up its own trigrams, and just the few words that share
+the most trigrams with it are handed to fuzzywuzzy for exact scoring.
+
+Plenty of ordinary words are one letter away from a listed word
+("public"/"pubic", "hoarse"/"hoare"). Tokens that are real English words,
+per the word frequency list shipped with pyspellchecker, are therefore
+never fuzzed unless they are listed themselves. Other tokens must be at
+least MIN_TOKEN_LENGTH letters long and within a single edit of the
+listed word they match.
+"""
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional, Tuple
+
+from fuzzywuzzy import fuzz
+from spellchecker import SpellChecker
+
+from utils.normalize import collapse
+
+# The lowest similarity score a guild may configure. The index never
+# returns candidates that cannot reach it, whatever the guild threshold.
+MIN_THRESHOLD = 75
+# Low enough for any single edit of a MIN_TOKEN_LENGTH-letter word.
+DEFAULT_THRESHOLD = 80
+
+# Shorter tokens have too many innocent neighbours ("duck", "canal") to fuzz.
+MIN_TOKEN_LENGTH = 6
+
+# A match is reported as (start, end, word), with `end` exclusive.
+Match = Tuple[int, int, str]
+
+_TOKEN = re.compile(r"[^\W\d_]{%d,}" % MIN_TOKEN_LENGTH)
+
+
+def _trigrams(word: str) -> set:
+    padded = f" {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@lru_cache(maxsize=1)
+def english_words() -> frozenset:
+    """The English words of pyspellchecker's frequency list that are long enough to be fuzzed."""
+    words = SpellChecker(language="en", distance=1).word_frequency.keys()
+    return frozenset(w for w in words if len(w) >= MIN_TOKEN_LENGTH and w.isascii() and w.isalpha())
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """Whether `b` is `a` with one letter inserted, deleted, replaced or swapped with its neighbour."""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) < len(b):
+        return a[i:] == b[i + 1:]
+    # Same length: one letter replaced, or two neighbours swapped.
+    return a[i + 1:] == b[i + 1:] or (a[i:i + 2] == b[i:i + 2][::-1] and a[i + 2:] == b[i + 2:])
+
+
+class FuzzyIndex:
+    """
+    A trigram index over single canonical words, used to catch near-miss
+    spellings that the exact matcher does not list.
+    """
+
+    def __init__(self, words: Iterable[str], max_candidates: int = 5, cache_size: int = 8192,
+                 dictionary: Optional[Iterable[str]] = None):
+        # A token one edit away from a listed word is at most one letter shorter than it.
+        self.words = sorted({w for w in words if " " not in w and len(w) >= MIN_TOKEN_LENGTH - 1})
+        # Listed words stay fuzzable even where they are also dictionary words ("fucker").
+        self.dictionary = (english_words() if dictionary is None else frozenset(dictionary)).difference(self.words)
+        self.max_candidates = max_candidates
+        self._postings = {}
+        for word_id, word in enumerate(self.words):
+            for gram in _trigrams(word):
+                self._postings.setdefault(gram, []).append(word_id)
+        # Chat repeats the same tokens constantly, so lookups are memoized.
+        self.best_match = lru_cache(maxsize=cache_size)(self._best_match)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def _best_match(self, token: str) -> Optional[Tuple[str, int]]:
+        """Returns the closest listed word and its score, if it can reach MIN_THRESHOLD."""
+        if token in self.dictionary:
+            return None
+        token = collapse(token)
+        if len(token) < MIN_TOKEN_LENGTH or token in self.dictionary:
+            return None
+        shared = Counter()
+        for gram in _trigrams(token):
+            shared.update(self._postings.get(gram, ()))
+        if not shared:
+            return None
+
+        best = None
+        for word_id, _ in shared.most_common(self.max_candidates):
+            word = self.words[word_id]
+            if word[0] != token[0] or not _within_one_edit(token, word):
+                continue
+            score = fuzz.ratio(token, word)
+            if score >= MIN_THRESHOLD and (best is None or score > best[1]):
+                best = (word, score)
+        return best
+
+    def finditer(self, folded: str, threshold: int = DEFAULT_THRESHOLD) -> Iterator[Match]:
+        """
+        Yields tokens of already folded text (see `utils.normalize.fold`)
+        that score at least `threshold` against a listed word.
+        """
+        for m in _TOKEN.finditer(folded):
+            best = self.best_match(m.group())
+            if best and best[1] >= threshold:
+                yield m.start(), m.end(), best[0]
+
+    def search(self, folded: str, threshold: int = DEFAULT_THRESHOLD) -> Optional[Match]:
+        """Returns the first near-miss spelling in `folded`, or None."""
+        return next(self.finditer(folded, threshold), None)
@@ -0,0 +1,176 @@
+"""
+Multi-pattern phrase matching for AutoMod.
+
+Every word and phrase in the list is folded into a prefix trie, and the trie
+is compiled into a single regular expression. Because sibling branches of the
+trie never share a first character, the regex engine walks at most one path
+per starting position, so a message is scanned in one linear pass in C
+instead of one Python-level lookup per token.
+
+`WordFilter` puts the normalization stage from `utils.normalize` in front of
+the matcher, so obfuscated spellings are caught without listing them.
+"""
+import re
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from utils.normalize import collapse, fold, run_lengths
+
+# A match is reported as (start, end, phrase), with `end` exclusive.
+Match = Tuple[int, int, str]
+
+
+def _build_trie(phrases: Iterable[str]) -> dict:
+    root = {}
+    for phrase in phrases:
+        node = root
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = True  # Marks the end of a phrase.
+    return root
+
+
+def _trie_to_pattern(node: dict, repeat: str = "") -> str:
+    """Turns a trie into a regex that prefers the longest phrase first."""
+    terminal = "" in node
+    branches = [
+        re.escape(ch) + repeat + _trie_to_pattern(child, repeat)
+        for ch, child in sorted(node.items()) if ch
+    ]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if terminal:
+        # The phrase may stop here; try the longer continuations first.
+        body = f"(?:{body})?" if len(branches) == 1 else body + "?"
+    return body
+
+
+class PhraseMatcher:
+    """
+    A compiled matcher over a set of words and phrases.
+
+    Phrases are matched case-insensitively on word boundaries, so "tit" does
+    not fire inside "titanic" but multi-word entries such as "whack off" do
+    match. The caller is expected to pass lowercased text.
+
+    With `squeeze=True` each character also matches a run of itself, so
+    "fuck" finds "fuuuck". Phrases must then not contain doubled characters
+    (see `utils.normalize.collapse`); this keeps the compiled pattern free of
+    ambiguous branches, so it still never backtracks across siblings.
+
+    `pattern` skips the trie build when the pattern for exactly these
+    phrases is already known, e.g. from a cached artifact.
+    """
+
+    def __init__(self, phrases: Iterable[str], squeeze: bool = False, pattern: Optional[str] = None):
+        self.phrases = frozenset(p.strip().lower() for p in phrases if p and p.strip())
+        if pattern is None and self.phrases:
+            body = _trie_to_pattern(_build_trie(self.phrases), "+" if squeeze else "")
+            pattern = rf"(?<!\w)(?:{body})(?!\w)"
+        self.pattern = pattern
+        self._regex = re.compile(pattern) if pattern else None
+
+    def __len__(self) -> int:
+        return len(self.phrases)
+
+    def __contains__(self, phrase: str) -> bool:
+        return phrase in self.phrases
+
+    def finditer(self, text: str) -> Iterator[Match]:
+        """Yields every non-overlapping phrase found in `text`, as it appears there."""
+        if self._regex is None:
+            return
+        for m in self._regex.finditer(text):
+            yield m.start(), m.end(), m.group()
+
+    def search(self, text: str) -> Optional[Match]:
+        """Returns the first match in `text`, or None if the text is clean."""
+        if self._regex is None:
+            return None
+        m = self._regex.search(text)
+        return (m.start(), m.end(), m.group()) if m else None
+
+
+class WordFilter:
+    """
+    Matches a word list against messages after obfuscation folding.
+
+    Each word is folded and collapsed to its canonical form, so hand-written
+    variants such as "f.u.c.k", "f_u_c_k" and "fuuck" share a single entry
+    in the compiled matcher. A message is only folded, then scanned once by
+    a squeezing matcher. Because squeezing lets "as" stand in for "ass",
+    hits on words with doubled letters are confirmed against the matched
+    text, which must repeat each letter at least as often as the
+    least-repeated listed spelling does.
+    """
+
+    def __init__(self, words: Iterable[str]):
+        # canonical form -> minimum run length of each character in it
+        runs: Dict[str, tuple] = {}
+        for word in words:
+            folded = fold(word).strip()
+            if not folded:
+                continue
+            canonical = collapse(folded)
+            lengths = run_lengths(folded)
+            known = runs.get(canonical)
+            runs[canonical] = lengths if known is None else tuple(map(min, known, lengths))
+        self._setup(runs, PhraseMatcher(runs, squeeze=True))
+
+    def _setup(self, runs: Dict[str, tuple], matcher: PhraseMatcher):
+        self._runs = runs
+        self._matcher = matcher
+        # Verifiers are compiled on first use; most words are never hit.
+        self._verifiers: Dict[str, Optional[re.Pattern]] = {}
+
+    @classmethod
+    def from_artifact(cls, artifact: dict) -> "WordFilter":
+        """Rebuilds a filter from `to_artifact` output without re-folding the list."""
+        runs = {canonical: tuple(lengths) for canonical, lengths in artifact["runs"].items()}
+        word_filter = cls.__new__(cls)
+        word_filter._setup(runs, PhraseMatcher(runs, squeeze=True, pattern=artifact["pattern"]))
+        return word_filter
+
+    def to_artifact(self) -> dict:
+        """Returns the compiled filter as JSON-serializable data."""
+        return {"runs": self._runs, "pattern": self._matcher.pattern}
+
+    def __len__(self) -> int:
+        return len(self._matcher)
+
+    def __contains__(self, word: str) -> bool:
+        return collapse(fold(word)) in self._matcher
+
+    @property
+    def phrases(self) -> frozenset:
+        """The canonical forms of every listed word and phrase."""
+        return self._matcher.phrases
+
+    def _verifier(self, canonical: str) -> Optional[re.Pattern]:
+        """Returns the run-length check for `canonical`, or None if it has no doubled letters."""
+        if canonical not in self._verifiers:
+            lengths = self._runs[canonical]
+            self._verifiers[canonical] = re.compile("".join(
+                re.escape(ch) + ("+" if count == 1 else f"{{{count},}}")
+                for ch, count in zip(canonical, lengths)
+            )) if max(lengths) > 1 else None
+        return self._verifiers[canonical]
+
+    def finditer(self, text: str) -> Iterator[Match]:
+        """
+        Yields each listed word found in `text`. Spans refer to the folded
+        text and the phrase is the word's canonical form.
+        """
+        return self.finditer_folded(fold(text))
+
+    def finditer_folded(self, folded: str) -> Iterator[Match]:
+        """Like `finditer`, for text that was already passed through `fold`."""
+        for start, end, found in self._matcher.finditer(folded):
+            canonical = collapse(found)
+            verifier = self._verifier(canonical)
+            if verifier is None or verifier.fullmatch(folded, start, end):
+                yield start, end, canonical
+
+    def search(self, text: str) -> Optional[Match]:
+        """Returns the first listed word found in `text`, or None."""
+        return next(self.finditer(text), None)
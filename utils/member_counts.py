@@ -0,0 +1,88 @@
+"""
+Per-guild member counters (humans, bots, boosters and members per role).
+
+Counts are built once from the member cache and then adjusted from member
+join, leave and update events, so reading them is O(1) instead of a walk
+over every member of the guild.
+"""
+from collections import Counter
+from typing import Dict, Optional
+
+import discord
+
+
+class GuildCounts:
+    """Member counts for one guild."""
+
+    __slots__ = ("humans", "bots", "boosters", "roles")
+
+    def __init__(self):
+        self.humans = 0
+        self.bots = 0
+        self.boosters = 0
+        self.roles: Counter = Counter()  # role_id -> members with the role (@everyone excluded)
+
+    @property
+    def total(self) -> int:
+        return self.humans + self.bots
+
+    def role_count(self, role_id: int) -> int:
+        return self.roles.get(role_id, 0)
+
+    def add(self, member: discord.Member, sign: int = 1):
+        if member.bot:
+            self.bots += sign
+        else:
+            self.humans += sign
+        if member.premium_since is not None:
+            self.boosters += sign
+        for role in member.roles:
+            if not role.is_default():
+                self._add_role(role.id, sign)
+
+    def _add_role(self, role_id: int, sign: int):
+        self.roles[role_id] += sign
+        if self.roles[role_id] <= 0:
+            del self.roles[role_id]
+
+    def remove(self, member: discord.Member):
+        self.add(member, -1)
+
+    def update(self, before: discord.Member, after: discord.Member):
+        if (before.premium_since is None) != (after.premium_since is None):
+            self.boosters += 1 if after.premium_since is not None else -1
+        old = {role.id for role in before.roles}
+        new = {role.id for role in after.roles}
+        for role_id in new - old:
+            self._add_role(role_id, 1)
+        for role_id in old - new:
+            self._add_role(role_id, -1)
+
+    def drop_role(self, role_id: int):
+        self.roles.pop(role_id, None)
+
+
+class MemberCounters:
+    """GuildCounts for every guild, seeded on first use."""
+
+    def __init__(self):
+        self._guilds: Dict[int, GuildCounts] = {}
+
+    def seed(self, guild: discord.Guild) -> GuildCounts:
+        """(Re)builds a guild's counts from its member cache. O(members); done once per guild."""
+        counts = GuildCounts()
+        for member in guild.members:
+            counts.add(member)
+        self._guilds[guild.id] = counts
+        return counts
+
+    def get(self, guild: discord.Guild) -> GuildCounts:
+        counts = self._guilds.get(guild.id)
+        return counts if counts is not None else self.seed(guild)
+
+    def peek(self, guild_id: int) -> Optional[GuildCounts]:
+        """Returns a guild's counts if they have been seeded, without seeding them."""
+        return self._guilds.get(guild_id)
+
+    def drop(self, guild_id: int):
+        self._guilds.pop(guild_id, None)
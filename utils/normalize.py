@@ -0,0 +1,102 @@
+"""
+Obfuscation-aware text normalization for AutoMod.
+
+`fold` undoes the usual tricks used to slip words past a filter: Unicode
+compatibility forms and look-alike letters, leetspeak, and separators
+between letters ("f.u.c.k"). `collapse` then squeezes repeated characters
+("chuuttiyyaa" -> "chutiya"). Every step is a single `str.translate`,
+`unicodedata.normalize` or compiled-regex pass, so the cost stays linear in
+the message length and runs in C rather than in a Python loop.
+"""
+import re
+import unicodedata
+
+# Letters from other scripts that render like Latin ones, plus invisible
+# characters that are used to split words apart. Fullwidth and "fancy"
+# mathematical letters are already handled by NFKC.
+_CONFUSABLES = str.maketrans({
+    # Cyrillic
+    "а": "a", "в": "b", "е": "e", "ё": "e", "к": "k", "м": "m", "н": "h",
+    "о": "o", "р": "p", "с": "c", "т": "t", "у": "y", "х": "x", "і": "i",
+    "ї": "i", "ј": "j", "ѕ": "s", "ԁ": "d", "ԛ": "q", "ԝ": "w", "ь": "b", "һ": "h",
+    # Greek
+    "α": "a", "β": "b", "ε": "e", "η": "n", "ι": "i", "κ": "k", "ν": "v",
+    "ο": "o", "ρ": "p", "τ": "t", "υ": "u", "χ": "x", "ς": "s",
+    # Zero-width and soft-hyphen characters
+    "\u00ad": None, "\u200b": None, "\u200c": None, "\u200d": None,
+    "\u2060": None, "\ufeff": None,
+})
+
+_CONFUSABLE_CHAR = re.compile("[%s]" % "".join(chr(c) for c in _CONFUSABLES))
+
+# Combining diacritics left over after NFKD ("fück" -> "fu" + U+0308).
+_DIACRITICS = re.compile("[\u0300-\u036f]+")
+
+_LEET = str.maketrans({
+    "0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t",
+    "@": "a", "$": "s", "€": "e", "!": "i", "|": "i", "+": "t",
+})
+
+# Leetspeak is folded by translating the whole text in one pass, then
+# putting back the spans that are not leetspeak: runs of word and leet
+# characters without a letter (pure numbers such as "100" or "24/7"), and
+# a trailing "!" or "|" on a run, which is punctuation ("shit!"). Both
+# alternatives start with a character class, so the engine can skip
+# ahead. Most messages have no leet characters at all, which `_LEET_CHAR`
+# finds out much faster.
+_LEET_CHAR = re.compile(r"[013457@$€!|+]")
+_NOT_LEET = re.compile(
+    r"[\d_@$€!|+](?<![\w@$€!|+].)[\d_@$€!|+]*(?![\w@$€!|+])"
+    r"|[!|]+(?![\w@$€!|+])"
+)
+
+# Punctuation used to split a word apart, only when it sits between letters.
+# The pattern starts with the separator class so the engine can skip ahead.
+_SEPARATORS = re.compile(r"[.\-_'~](?<=[^\W\d_].)[.\-_'~]*(?=[^\W\d_])")
+
+_REPEATS = re.compile(r"(.)\1+", re.DOTALL)
+_RUNS = re.compile(r"(.)\1*", re.DOTALL)
+
+
+def _fold_leet(text: str) -> str:
+    folded = text.translate(_LEET)
+    parts = []
+    pos = 0
+    for m in _NOT_LEET.finditer(text):
+        parts.append(folded[pos:m.start()])
+        parts.append(m.group())
+        pos = m.end()
+    if not parts:
+        return folded
+    parts.append(folded[pos:])
+    return "".join(parts)
+
+
+def fold(text: str) -> str:
+    """
+    Returns the canonical, lowercase form of `text` with look-alike
+    characters, leetspeak, letter masks and in-word separators folded away.
+    Repeated characters are kept; see `collapse`.
+    """
+    if not text.isascii():
+        text = _DIACRITICS.sub("", unicodedata.normalize("NFKD", text))
+        text = unicodedata.normalize("NFKC", text).lower()
+        if _CONFUSABLE_CHAR.search(text):
+            text = text.translate(_CONFUSABLES)
+    else:
+        text = text.lower()
+    if _LEET_CHAR.search(text):
+        text = _fold_leet(text)
+    # Characters used to mask letters ("c##t", "sh*t") count as one symbol.
+    text = text.replace("#", "*")
+    return _SEPARATORS.sub("", text)
+
+
+def collapse(text: str) -> str:
+    """Squeezes every run of a repeated character down to one character."""
+    return _REPEATS.sub(r"\1", text)
+
+
+def run_lengths(text: str) -> tuple:
+    """Returns the length of each run of repeated characters in `text`."""
+    return tuple(len(m.group()) for m in _RUNS.finditer(text))
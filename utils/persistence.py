@@ -0,0 +1,94 @@
+"""
+Write-behind JSON persistence for cog state.
+
+Handlers change their in-memory state and call `mark_dirty()`; the file is
+written later by a background task, at most once per `delay` seconds, in a
+worker thread. Writes go to a temporary file that is then renamed over the
+real one, so a crash mid-write leaves the previous version intact.
+"""
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Callable, Optional
+
+log = logging.getLogger(__name__)
+
+
+def load_json(path: str, default: Any) -> Any:
+    """Reads a JSON file, returning `default` if it is missing or invalid."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except json.JSONDecodeError as e:
+        log.error("%s is invalid, starting from scratch: %s", path, e)
+        return default
+
+
+def write_json_atomic(path: str, data: Any):
+    """Writes `data` to a temporary file and renames it over `path`."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class WriteBehindFile:
+    """
+    Debounced, non-blocking saving of one JSON file.
+
+    `snapshot` is called on the event loop and must return a JSON-ready copy
+    of the state (so the worker thread never sees it change mid-write).
+    """
+
+    def __init__(self, path: str, snapshot: Callable[[], Any], delay: float = 2.0):
+        self.path = path
+        self.snapshot = snapshot
+        self.delay = delay
+        self._dirty = False
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def mark_dirty(self):
+        """Schedules a flush; changes made before it runs are written together."""
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        # Changes marked while a write is in progress find this task still
+        # running and schedule nothing, so keep flushing until none are left.
+        while True:
+            await asyncio.sleep(self.delay)
+            if not await self.flush() or not self._dirty:
+                return
+
+    async def flush(self) -> bool:
+        """Writes the current state in a worker thread if it changed. Returns False if the write failed."""
+        async with self._lock:
+            if not self._dirty:
+                return True
+            self._dirty = False
+            data = self.snapshot()
+            try:
+                await asyncio.to_thread(write_json_atomic, self.path, data)
+            except OSError as e:
+                # Try again with the next change (or the final flush).
+                self._dirty = True
+                log.error("Failed to save %s: %s", self.path, e)
+                return False
+            return True
+
+    async def close(self):
+        """Writes whatever is still unsaved, without waiting for the debounce delay."""
+        task = self._task
+        if task is not None and not task.done() and task is not asyncio.current_task():
+            # Only cut the delay short; a write already in progress has to finish,
+            # and while the lock is held the task cannot be inside one.
+            async with self._lock:
+                task.cancel()
+        await self.flush()
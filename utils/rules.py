@@ -0,0 +1,94 @@
+"""
+Per-guild AutoMod rule sets.
+
+A guild's settings are compiled once into an immutable `GuildRules`, so the
+message listener only needs a dict lookup to know which checks apply and
+which word list to use. Guilds that add or remove words get their own
+compiled word list; everyone else shares the global one. Allowed and
+denied link domains are compiled into a `utils.domains.DomainRules` trie.
+"""
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Optional
+
+from utils.domains import DomainRules
+from utils.flood import FloodLimits
+from utils.normalize import collapse, fold
+from utils.scanner import BAD_WORD, INVITE, LINK
+from utils.wordlist import CompiledWordList, load_word_filter
+
+FLOOD = "flood"
+
+# Checks a guild can switch off. Fuzzy matching and flood detection also
+# need their own settings (a threshold and limits) to be on.
+CHECKS = (BAD_WORD, INVITE, LINK, FLOOD)
+
+DEFAULT_CONFIG = {
+    "disabled_checks": [],
+    "fuzzy_threshold": None,
+    "flood": None,  # Off until /automod flood turns it on, e.g. {} for the FloodLimits defaults
+    "extra_words": [],
+    "removed_words": [],
+    "exempt_roles": [],
+    "exempt_channels": [],
+    "allowed_domains": [],
+    "denied_domains": [],
+    "bypass_manage_guild": True,
+    "shadow": False,
+}
+
+
+@dataclass(frozen=True)
+class GuildRules:
+    """The compiled AutoMod rules of one guild."""
+    version: str
+    checks: frozenset
+    word_list: CompiledWordList
+    fuzzy_threshold: Optional[int]
+    flood_limits: Optional[FloodLimits]
+    exempt_roles: frozenset
+    exempt_channels: frozenset
+    domains: DomainRules
+    bypass_manage_guild: bool
+    shadow: bool  # record would-be violations instead of acting on them
+
+
+def guild_config(settings: dict) -> dict:
+    """Returns a guild's settings with defaults filled in."""
+    return {**DEFAULT_CONFIG, **settings}
+
+
+def needs_own_word_list(config: dict) -> bool:
+    return bool(config["extra_words"] or config["removed_words"])
+
+
+def compile_guild_rules(config: dict, base: CompiledWordList) -> GuildRules:
+    """
+    Compiles a guild's settings (see `guild_config`) against the global word
+    list. Compiling a custom word list takes a moment, so call this from a
+    worker thread when `needs_own_word_list(config)` is true.
+    """
+    word_list = base
+    if needs_own_word_list(config):
+        removed = {collapse(fold(w)).strip() for w in config["removed_words"]}
+        words = sorted(
+            w for w in {*base.words, *(w.strip().lower() for w in config["extra_words"])}
+            if w and collapse(fold(w)).strip() not in removed
+        )
+        word_list = load_word_filter(words, cache_dir=None)
+
+    config_hash = hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()
+    flood = config["flood"]
+    return GuildRules(
+        version=f"{base.digest}:{config_hash[:16]}",
+        checks=frozenset(CHECKS) - set(config["disabled_checks"]),
+        word_list=word_list,
+        fuzzy_threshold=config["fuzzy_threshold"],
+        flood_limits=FloodLimits(**flood) if flood is not None else None,
+        exempt_roles=frozenset(config["exempt_roles"]),
+        exempt_channels=frozenset(config["exempt_channels"]),
+        domains=DomainRules(config["allowed_domains"], config["denied_domains"]),
+        bypass_manage_guild=config["bypass_manage_guild"],
+        shadow=config["shadow"],
+    )
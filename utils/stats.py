@@ -0,0 +1,91 @@
+"""
+Hit counters and latency histograms for AutoMod's shadow mode.
+
+Histograms use fixed millisecond buckets, so recording a sample is a
+bisect and an increment, and merging or saving them is cheap. Percentiles
+are reported as the upper bound of the bucket they fall in.
+"""
+from bisect import bisect_left
+from typing import Dict, Iterable
+
+# Upper bounds of the latency buckets, in milliseconds. Slower samples go
+# into a final overflow bucket.
+BUCKETS_MS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0)
+
+
+class LatencyHistogram:
+    """Counts latency samples per bucket of `BUCKETS_MS`."""
+
+    def __init__(self, counts: Iterable[int] = (), total_ms: float = 0.0):
+        self.counts = list(counts) or [0] * (len(BUCKETS_MS) + 1)
+        self.total_ms = total_ms
+
+    @property
+    def samples(self) -> int:
+        return sum(self.counts)
+
+    def record(self, ms: float):
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.total_ms += ms
+
+    def percentile(self, q: float) -> float:
+        """Returns the bucket bound below which a fraction `q` of the samples fall (inf if in overflow)."""
+        samples = self.samples
+        if not samples:
+            return 0.0
+        needed = q * samples
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= needed:
+                return bound
+        return float("inf")
+
+    @property
+    def mean(self) -> float:
+        samples = self.samples
+        return self.total_ms / samples if samples else 0.0
+
+    def to_dict(self) -> dict:
+        return {"counts": self.counts, "total_ms": round(self.total_ms, 3)}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyHistogram":
+        counts = data.get("counts", [])
+        # Histograms saved with different buckets can't be merged; start over.
+        if len(counts) != len(BUCKETS_MS) + 1:
+            return cls()
+        return cls(counts, data.get("total_ms", 0.0))
+
+
+class RuleStats:
+    """Messages checked, would-be hits and latency per rule for one guild."""
+
+    def __init__(self):
+        self.messages = 0
+        self.hits: Dict[str, int] = {}
+        self.latency: Dict[str, LatencyHistogram] = {}
+
+    def record_latency(self, rule: str, ms: float):
+        histogram = self.latency.get(rule)
+        if histogram is None:
+            histogram = self.latency[rule] = LatencyHistogram()
+        histogram.record(ms)
+
+    def record_hit(self, rule: str):
+        self.hits[rule] = self.hits.get(rule, 0) + 1
+
+    def to_dict(self) -> dict:
+        return {
+            "messages": self.messages,
+            "hits": self.hits,
+            "latency": {rule: histogram.to_dict() for rule, histogram in self.latency.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RuleStats":
+        stats = cls()
+        stats.messages = data.get("messages", 0)
+        stats.hits = dict(data.get("hits", {}))
+        stats.latency = {rule: LatencyHistogram.from_dict(h) for rule, h in data.get("latency", {}).items()}
+        return stats
@@ -0,0 +1,234 @@
+"""
+Deadline scheduling without polling, and durable timers for moderation
+actions that expire (temporary bans, timed channel locks, timed slowmode).
+
+`DeadlineQueue` keeps pending deadlines in a min-heap and sleeps until the
+earliest one; adding an earlier deadline wakes it up. Adding and cancelling
+are O(log n): cancelled entries are only dropped from the heap when they
+reach the top. Deadlines already in the past are due right away, oldest
+first, which is how work missed while the bot was offline catches up.
+
+`TimerService` stores timers in SQLite, so they survive restarts, and
+fires them through a DeadlineQueue.
+
+Each timer has a key (kind, guild_id, target_id); scheduling a timer with
+the key of a pending one replaces it.
+"""
+import asyncio
+import heapq
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS timers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    guild_id INTEGER NOT NULL,
+    target_id INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    data TEXT NOT NULL,
+    UNIQUE (kind, guild_id, target_id)
+);
+"""
+
+
+class DeadlineQueue:
+    """Keys ordered by deadline (Unix timestamps), each key at most once."""
+
+    def __init__(self, items: Iterable[Tuple[Hashable, float]] = ()):
+        self._deadlines: Dict[Hashable, float] = dict(items)
+        self._heap: List[Tuple[float, Hashable]] = [(deadline, key) for key, deadline in self._deadlines.items()]
+        heapq.heapify(self._heap)
+        self._wakeup = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._deadlines
+
+    def items(self) -> List[Tuple[Hashable, float]]:
+        """Returns the pending (key, deadline) pairs, earliest first."""
+        return sorted(self._deadlines.items(), key=lambda item: item[1])
+
+    def push(self, key: Hashable, deadline: float):
+        """Adds a key, or moves it to a new deadline."""
+        self._deadlines[key] = deadline
+        heapq.heappush(self._heap, (deadline, key))
+        if self._heap[0] == (deadline, key):
+            # The new deadline is the next one due; let the waiter recompute its sleep.
+            self._wakeup.set()
+
+    def discard(self, key: Hashable):
+        self._deadlines.pop(key, None)
+
+    def _is_stale(self, entry: Tuple[float, Hashable]) -> bool:
+        deadline, key = entry
+        return self._deadlines.get(key) != deadline
+
+    async def next_due(self) -> Hashable:
+        """Waits until the earliest deadline passes, then removes and returns its key."""
+        while True:
+            # Drop cancelled or moved entries that reached the top of the heap.
+            while self._heap and self._is_stale(self._heap[0]):
+                heapq.heappop(self._heap)
+
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+            delay = self._heap[0][0] - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _, key = heapq.heappop(self._heap)
+            del self._deadlines[key]
+            return key
+
+
+class Timer(NamedTuple):
+    id: int
+    kind: str
+    guild_id: int
+    target_id: int
+    expires_at: float  # Unix timestamp
+    data: dict
+
+    @property
+    def key(self) -> Tuple[str, int, int]:
+        return self.kind, self.guild_id, self.target_id
+
+
+class TimerStore:
+    """SQLite storage for timers. Blocking; call it from a worker thread."""
+
+    def __init__(self, path: str = "timers.db"):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def load(self) -> List[Timer]:
+        with self._lock:
+            rows = self._db.execute("SELECT id, kind, guild_id, target_id, expires_at, data FROM timers").fetchall()
+        return [Timer(*row[:5], json.loads(row[5])) for row in rows]
+
+    def put(self, kind: str, guild_id: int, target_id: int, expires_at: float, data: dict) -> int:
+        """Inserts a timer, replacing the one with the same key, and returns its id."""
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM timers WHERE kind = ? AND guild_id = ? AND target_id = ?", (kind, guild_id, target_id)
+            )
+            return self._db.execute(
+                "INSERT INTO timers (kind, guild_id, target_id, expires_at, data) VALUES (?, ?, ?, ?, ?)",
+                (kind, guild_id, target_id, expires_at, json.dumps(data))
+            ).lastrowid
+
+    def delete(self, timer_id: int):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM timers WHERE id = ?", (timer_id,))
+
+    def delete_key(self, kind: str, guild_id: int, target_id: int):
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM timers WHERE kind = ? AND guild_id = ? AND target_id = ?", (kind, guild_id, target_id)
+            )
+
+
+class TimerService:
+    """
+    Runs `handler(timer)` when each timer expires. Call `start()` once the
+    handler can run (e.g. when the bot is ready) and `close()` on shutdown.
+    """
+
+    def __init__(self, handler: Callable[[Timer], Awaitable[None]], path: str = "timers.db"):
+        self.handler = handler
+        self.store = TimerStore(path)
+        self._queue = DeadlineQueue()  # timer ids by expiry
+        self._timers: Dict[int, Timer] = {}  # pending timers by id
+        self._by_key: Dict[Tuple[str, int, int], int] = {}  # key -> timer id
+        self._task: Optional[asyncio.Task] = None
+        # Held while start() loads the stored timers, so schedule() and cancel()
+        # never interleave with the load.
+        self._loading = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    async def start(self):
+        """Loads the persisted timers and starts firing them, catching up on missed ones first."""
+        async with self._loading:
+            timers = await asyncio.to_thread(self.store.load)
+            for timer in timers:
+                self._timers[timer.id] = timer
+                self._by_key[timer.key] = timer.id
+            self._queue = DeadlineQueue((timer.id, timer.expires_at) for timer in timers)
+        overdue = sum(1 for timer in timers if timer.expires_at <= time.time())
+        if overdue:
+            log.info("%d timers expired while offline, firing them now.", overdue)
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+        self.store.close()
+
+    def get(self, kind: str, guild_id: int, target_id: int) -> Optional[Timer]:
+        timer_id = self._by_key.get((kind, guild_id, target_id))
+        return self._timers.get(timer_id) if timer_id is not None else None
+
+    async def schedule(self, kind: str, guild_id: int, target_id: int, expires_at: float, data: Optional[dict] = None) -> Timer:
+        """Schedules a timer (replacing a pending one with the same key)."""
+        data = data or {}
+        async with self._loading:
+            timer_id = await asyncio.to_thread(self.store.put, kind, guild_id, target_id, expires_at, data)
+            old_id = self._by_key.get((kind, guild_id, target_id))
+            if old_id is not None:
+                self._timers.pop(old_id, None)
+                self._queue.discard(old_id)
+            timer = Timer(timer_id, kind, guild_id, target_id, expires_at, data)
+            self._timers[timer_id] = timer
+            self._by_key[timer.key] = timer_id
+            self._queue.push(timer_id, expires_at)
+            return timer
+
+    async def cancel(self, kind: str, guild_id: int, target_id: int) -> Optional[Timer]:
+        """
+        Cancels the pending timer with this key, if any, and returns it (None
+        if it was not loaded yet; it is still removed from the store).
+        """
+        async with self._loading:
+            timer_id = self._by_key.pop((kind, guild_id, target_id), None)
+            timer = self._timers.pop(timer_id, None) if timer_id is not None else None
+            if timer_id is not None:
+                self._queue.discard(timer_id)
+            # By key, so timers stored before start() loaded them are cancelled too.
+            await asyncio.to_thread(self.store.delete_key, kind, guild_id, target_id)
+            return timer
+
+    async def _run(self):
+        while True:
+            timer_id = await self._queue.next_due()
+            timer = self._timers.pop(timer_id)
+            if self._by_key.get(timer.key) == timer_id:
+                del self._by_key[timer.key]
+            try:
+                await self.handler(timer)
+            except Exception:
+                log.exception("Timer %s for guild %s (target %s) failed.", timer.kind, timer.guild_id, timer.target_id)
+            await asyncio.to_thread(self.store.delete, timer_id)
@@ -0,0 +1,205 @@
+"""
+SQLite storage for moderation warnings.
+
+Warnings are rows in a WAL-mode database, so issuing one is a single
+indexed insert instead of rewriting the whole history, and nothing is
+loaded into memory at startup. Indexes cover the lookups the commands
+make: per member (guild_id, member_id), per moderator and by time.
+
+History is read a page at a time with a cursor (the last row id seen), so
+a page costs the same however long the history is. Per-member totals are
+kept in a summary table, so counts and "most warned" rankings are index
+lookups instead of scans.
+
+The methods are blocking; call them through `asyncio.to_thread` from
+coroutines. A single connection is shared between threads behind a lock.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import List, NamedTuple, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS warnings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    guild_id INTEGER NOT NULL,
+    member_id INTEGER NOT NULL,
+    moderator_id INTEGER NOT NULL,
+    reason TEXT NOT NULL,
+    timestamp INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_warnings_member ON warnings (guild_id, member_id, id);
+CREATE INDEX IF NOT EXISTS idx_warnings_moderator ON warnings (moderator_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_warnings_timestamp ON warnings (timestamp);
+CREATE INDEX IF NOT EXISTS idx_warnings_guild_moderator_time ON warnings (guild_id, moderator_id, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_warnings_guild_time ON warnings (guild_id, timestamp);
+CREATE TABLE IF NOT EXISTS warning_counts (
+    guild_id INTEGER NOT NULL,
+    member_id INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, member_id)
+);
+CREATE INDEX IF NOT EXISTS idx_warning_counts_rank ON warning_counts (guild_id, count DESC);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class WarningRecord(NamedTuple):
+    id: int
+    guild_id: int
+    member_id: int
+    moderator_id: int
+    reason: str
+    timestamp: int
+
+
+class WarningStore:
+    """Warnings per (guild, member), stored in SQLite."""
+
+    def __init__(self, path: str = "warnings.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL only risks the last transactions on power loss, never corruption.
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _rebuild_counts(self):
+        self._db.execute("DELETE FROM warning_counts")
+        self._db.execute(
+            "INSERT INTO warning_counts (guild_id, member_id, count) "
+            "SELECT guild_id, member_id, COUNT(*) FROM warnings GROUP BY guild_id, member_id"
+        )
+
+    def add(self, guild_id: int, member_id: int, moderator_id: int, reason: str, timestamp: int) -> int:
+        """Appends a warning and returns the member's warning count."""
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO warnings (guild_id, member_id, moderator_id, reason, timestamp) VALUES (?, ?, ?, ?, ?)",
+                (guild_id, member_id, moderator_id, reason, timestamp)
+            )
+            self._db.execute(
+                "INSERT INTO warning_counts (guild_id, member_id, count) VALUES (?, ?, 1) "
+                "ON CONFLICT (guild_id, member_id) DO UPDATE SET count = count + 1",
+                (guild_id, member_id)
+            )
+            return self._count(guild_id, member_id)
+
+    def count(self, guild_id: int, member_id: int) -> int:
+        with self._lock:
+            return self._count(guild_id, member_id)
+
+    def _count(self, guild_id: int, member_id: int) -> int:
+        row = self._db.execute(
+            "SELECT count FROM warning_counts WHERE guild_id = ? AND member_id = ?", (guild_id, member_id)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _page(self, where: str, params: tuple, before_id: Optional[int], limit: int) -> List[WarningRecord]:
+        if before_id is not None:
+            where += " AND id < ?"
+            params += (before_id,)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, guild_id, member_id, moderator_id, reason, timestamp FROM warnings "
+                f"WHERE {where} ORDER BY id DESC LIMIT ?",
+                params + (limit,)
+            ).fetchall()
+        return [WarningRecord(*row) for row in rows]
+
+    def latest(self, guild_id: int, member_id: int, limit: int = 10, before_id: Optional[int] = None) -> List[WarningRecord]:
+        """
+        Returns a member's warnings newest first, starting after the cursor
+        `before_id` (the id of the last warning on the previous page).
+        """
+        return self._page("guild_id = ? AND member_id = ?", (guild_id, member_id), before_id, limit)
+
+    def by_moderator(self, guild_id: int, moderator_id: int, since: int = 0,
+                     limit: int = 10, before_id: Optional[int] = None) -> List[WarningRecord]:
+        """
+        Returns the warnings a moderator issued since `since` (a Unix
+        timestamp), newest first, starting after the cursor `before_id`.
+        """
+        # Ordered by (timestamp, id) so the time window is a range of
+        # idx_warnings_guild_moderator_time and a page reads only its own rows.
+        where = "guild_id = ? AND moderator_id = ? AND timestamp >= ?"
+        params = (guild_id, moderator_id, since)
+        if before_id is not None:
+            where += " AND (timestamp, id) < (SELECT timestamp, id FROM warnings WHERE id = ?)"
+            params += (before_id,)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, guild_id, member_id, moderator_id, reason, timestamp FROM warnings "
+                f"WHERE {where} ORDER BY timestamp DESC, id DESC LIMIT ?",
+                params + (limit,)
+            ).fetchall()
+        return [WarningRecord(*row) for row in rows]
+
+    def top_members(self, guild_id: int, limit: int = 10, offset: int = 0) -> List[Tuple[int, int]]:
+        """Returns (member_id, warning count) for the most warned members of a guild."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT member_id, count FROM warning_counts WHERE guild_id = ? ORDER BY count DESC LIMIT ? OFFSET ?",
+                (guild_id, limit, offset)
+            ).fetchall()
+
+    def clear(self, guild_id: int, member_id: int) -> int:
+        """Deletes all of a member's warnings and returns how many there were."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM warning_counts WHERE guild_id = ? AND member_id = ?", (guild_id, member_id))
+            return self._db.execute(
+                "DELETE FROM warnings WHERE guild_id = ? AND member_id = ?", (guild_id, member_id)
+            ).rowcount
+
+    def migrate_json(self, json_path: str) -> int:
+        """
+        Imports warnings from the old warnings.json (keyed "{guild}-{member}")
+        once, then renames the file to `<name>.migrated`. Returns the number
+        of warnings imported.
+        """
+        with self._lock:
+            done = self._db.execute("SELECT value FROM meta WHERE key = 'json_migrated'").fetchone()
+        if done or not os.path.exists(json_path):
+            return 0
+
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            log.error("Could not migrate %s, leaving it in place: %s", json_path, e)
+            return 0
+
+        rows = []
+        for key, warnings_list in data.items():
+            try:
+                guild_id, member_id = (int(part) for part in key.split("-", 1))
+            except ValueError:
+                log.warning("Skipping malformed warnings key %r in %s.", key, json_path)
+                continue
+            for w in warnings_list:
+                rows.append((guild_id, member_id, w["moderator_id"], w["reason"], w["timestamp"]))
+        # Oldest first, so row ids keep the original order.
+        rows.sort(key=lambda row: row[4])
+
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO warnings (guild_id, member_id, moderator_id, reason, timestamp) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', ?)", (json_path,))
+            self._rebuild_counts()
+        os.replace(json_path, f"{json_path}.migrated")
+        log.info("Migrated %d warnings from %s to %s.", len(rows), json_path, self.path)
+        return len(rows)
@@ -0,0 +1,118 @@
+"""
+Loads AutoMod's word list from all of its sources and caches the compiled
+filter on disk.
+
+The merged list is hashed, and the compiled `WordFilter` is stored as a
+JSON artifact named after that hash. Starting up with an unchanged list
+reads the artifact instead of re-folding every word and rebuilding the
+matcher pattern; any change to a source produces a new hash and therefore
+a fresh artifact.
+"""
+import glob
+import hashlib
+import json
+import logging
+import os
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from utils.fuzzy import FuzzyIndex
+from utils.matcher import WordFilter
+
+log = logging.getLogger(__name__)
+
+# Bump whenever normalization or the artifact layout changes, so artifacts
+# written by older code are never loaded.
+ARTIFACT_VERSION = 1
+
+ARTIFACT_PREFIX = "wordfilter-"
+
+
+class CompiledWordList(NamedTuple):
+    """Everything compiled from one version of the word list."""
+    digest: str
+    words: Tuple[str, ...]
+    word_filter: WordFilter
+    fuzzy_index: FuzzyIndex
+
+
+def read_word_file(path: str) -> List[str]:
+    """
+    Reads words from a JSON file (a list, or an object with a "bad_words"
+    list) or from a plain text file with one word per line.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            data = json.load(f)
+            return list(data["bad_words"] if isinstance(data, dict) else data)
+        return [line.strip() for line in f if line.strip()]
+
+
+def merge_sources(paths: Iterable[str], extra_words: Iterable[str] = ()) -> List[str]:
+    """Merges the word files and any extra words into one sorted, deduplicated list."""
+    words = {w.strip().lower() for w in extra_words if w.strip()}
+    for path in paths:
+        try:
+            words.update(w.strip().lower() for w in read_word_file(path) if w.strip())
+        except FileNotFoundError:
+            log.warning("Word list source %s not found, skipping it.", path)
+        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            log.error("Word list source %s is invalid, skipping it: %s", path, e)
+    return sorted(words)
+
+
+def content_hash(words: List[str]) -> str:
+    """Hashes a merged word list together with the artifact version."""
+    digest = hashlib.sha256(f"v{ARTIFACT_VERSION}\n".encode("utf-8"))
+    digest.update("\n".join(words).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _artifact_path(cache_dir: str, digest: str) -> str:
+    return os.path.join(cache_dir, f"{ARTIFACT_PREFIX}{digest[:16]}.json")
+
+
+def _write_artifact(cache_dir: str, digest: str, word_filter: WordFilter):
+    """Writes the artifact atomically and removes artifacts for older lists."""
+    path = _artifact_path(cache_dir, digest)
+    artifact = {"version": ARTIFACT_VERSION, "digest": digest, **word_filter.to_artifact()}
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(artifact, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        for stale in glob.glob(os.path.join(cache_dir, f"{ARTIFACT_PREFIX}*.json")):
+            if stale != path:
+                os.remove(stale)
+    except OSError as e:
+        log.error("Failed to write word list artifact %s: %s", path, e)
+
+
+def load_word_filter(words: List[str], cache_dir: Optional[str] = "data") -> CompiledWordList:
+    """
+    Returns the compiled filter for `words`, loading it from the on-disk
+    artifact when one exists for this exact list and compiling (and caching)
+    it otherwise. With `cache_dir=None` the filter is compiled in memory
+    only. Safe to call from a worker thread.
+    """
+    digest = content_hash(words)
+    word_filter = None
+    if cache_dir is not None:
+        path = _artifact_path(cache_dir, digest)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                artifact = json.load(f)
+            if artifact.get("version") == ARTIFACT_VERSION and artifact.get("digest") == digest:
+                word_filter = WordFilter.from_artifact(artifact)
+        except FileNotFoundError:
+            pass
+        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            log.warning("Ignoring unreadable word list artifact %s: %s", path, e)
+
+    if word_filter is None:
+        word_filter = WordFilter(words)
+        if cache_dir is not None:
+            _write_artifact(cache_dir, digest, word_filter)
+            log.info("Compiled %d words into word list artifact %s.", len(words), digest[:16])
+
+    return CompiledWordList(digest, tuple(words), word_filter, FuzzyIndex(word_filter.phrases))